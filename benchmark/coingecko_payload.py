@@ -0,0 +1,64 @@
+"""
+Compares payload size and decode time of the coin document request, which
+was used to read coin price, with the price-only request.
+
+Usage:
+# python -m benchmark.coingecko_payload bitcoin
+"""
+import asyncio
+import json as std_json
+import sys
+import timeit
+from typing import Callable, Mapping, Optional
+
+import aiohttp
+import orjson
+
+from settings import settings
+
+
+DECODE_REPEATS = 200
+
+
+async def fetch(
+    session: aiohttp.ClientSession,
+    path: str,
+    params: Optional[Mapping[str, str]] = None
+) -> bytes:
+    async with session.get(f'{settings.COINGECKO_API_URL}{path}', params=params) as response:
+        response.raise_for_status()
+        return await response.read()
+
+
+def measure_decode(
+    body: bytes,
+    loads: Callable[[bytes], object]
+) -> float:
+    """
+    Returns mean decode time in microseconds
+    """
+    seconds = timeit.timeit(lambda: loads(body), number=DECODE_REPEATS)
+    return seconds / DECODE_REPEATS * 1_000_000
+
+
+async def main(coin_id: str) -> None:
+    async with aiohttp.ClientSession() as session:
+        full_document = await fetch(session, f'/coins/{coin_id}')
+        price_only = await fetch(
+            session,
+            '/simple/price',
+            params={'ids': coin_id, 'vs_currencies': 'usd'}
+        )
+
+    cases = (
+        ('before: /coins/{id} + json', full_document, std_json.loads),
+        ('before: /coins/{id} + orjson', full_document, orjson.loads),
+        ('after: /simple/price + orjson', price_only, orjson.loads),
+    )
+    print(f'{"case":<32}{"bytes":>12}{"decode, us":>14}')
+    for name, body, loads in cases:
+        print(f'{name:<32}{len(body):>12}{measure_decode(body, loads):>14.1f}')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else 'bitcoin'))
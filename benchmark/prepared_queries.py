@@ -0,0 +1,66 @@
+"""
+Compares the hottest per-update queries run by ORM statements with the
+same queries run as asyncpg prepared statements. Database from settings
+is used, tg_id must be id of existing user. Read cache of users is turned
+off, so every call runs query.
+
+Usage:
+# python -m benchmark.prepared_queries 123456789
+"""
+import asyncio
+import sys
+import time
+from typing import Awaitable, Callable, Dict
+
+from source.service import domain
+from source.session import engine
+from source.provider.holdings import HoldingsProvider
+from source.provider.user import UsersProvider
+
+
+REPEATS = 2000
+
+
+def make_cases(
+    tg_id: int
+) -> Dict[str, Callable[[bool], Awaitable]]:
+    users = UsersProvider()
+    # otherwise both paths would return user from read cache
+    users._read_cache_ttl = None
+    holdings = HoldingsProvider()
+
+    return {
+        'user by tg_id': lambda fast: users.get_by_tg_id(tg_id, fast=fast),
+        'holdings by tg_id + type': lambda fast: holdings.select_by_user(
+            tg_id, domain.AssetsTypes.CRYPTO.value, fast=fast
+        ),
+    }
+
+
+async def measure(
+    call: Callable[[bool], Awaitable],
+    fast: bool
+) -> float:
+    """
+    Returns mean time of one call in microseconds
+    """
+    await call(fast)
+    started_at = time.perf_counter()
+    for _ in range(REPEATS):
+        await call(fast)
+    return (time.perf_counter() - started_at) / REPEATS * 1_000_000
+
+
+async def main(
+    tg_id: int
+) -> None:
+    print(f'{"query":<28}{"orm, us":>12}{"prepared, us":>14}{"speedup":>10}')
+    for name, call in make_cases(tg_id).items():
+        before = await measure(call, fast=False)
+        after = await measure(call, fast=True)
+        print(f'{name:<28}{before:>12.1f}{after:>14.1f}{before / after:>9.1f}x')
+    await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1])))
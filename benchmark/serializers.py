@@ -0,0 +1,114 @@
+"""
+Compares building of domain.UserList and domain.AssetsList from 100k rows
+by validated pydantic models, which were built by one awaited coroutine per
+row, with trusted batch builders. Rows are plain objects with attributes
+of orm models, so database is not used.
+
+Usage:
+# python -m benchmark.serializers
+"""
+import asyncio
+import datetime
+import gc
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from source.service import domain
+from source.provider.serializer import records_to_users, records_to_assets
+
+
+ROWS = 100_000
+
+
+def make_user_rows() -> List[Tuple[Any]]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        (SimpleNamespace(
+            tg_id=100_000_000 + i,
+            username=f'user_{i}',
+            first_name=f'First {i}',
+            last_name=None,
+            phone_number=None,
+            is_bot=False,
+            language_code='ru',
+            added_to_attachment_menu=False,
+            can_join_groups=True,
+            can_read_all_group_messages=False,
+            supports_inline_queries=False,
+            is_superuser=False,
+            last_activity=now,
+            registration_date=now,
+        ),)
+        for i in range(ROWS)
+    ]
+
+
+def make_assets_rows() -> List[Tuple[Any]]:
+    return [
+        (SimpleNamespace(
+            tg_id=100_000_000 + i,
+            type=domain.AssetsTypes.CRYPTO.value,
+        ),)
+        for i in range(ROWS)
+    ]
+
+
+async def validated_users(records: List[Tuple[Any]]) -> domain.UserList:
+    async def record_to_users(record: Any) -> domain.Users:
+        return domain.Users(**{name: getattr(record, name) for name in domain.Users.__fields__})
+
+    user_list = domain.UserList()
+    for record in records:
+        user_list.items.append(await record_to_users(*record))
+    return user_list
+
+
+async def validated_assets(records: List[Tuple[Any]]) -> domain.AssetsList:
+    async def record_to_assets(record: Any) -> domain.Assets:
+        return domain.Assets(tg_id=record.tg_id, assets=None, assets_type=record.type)
+
+    assets_list = domain.AssetsList()
+    for record in records:
+        assets_list.items.append(await record_to_assets(*record))
+    return assets_list
+
+
+def measure(
+    adapter: Callable[[List[Tuple[Any]]], Awaitable],
+    records: List[Tuple[Any]]
+) -> Tuple[float, float]:
+    """
+    Returns time in microseconds and allocated memory in bytes per row
+    """
+    gc.collect()
+    tracemalloc.start()
+    started_at = time.perf_counter()
+    result = asyncio.run(adapter(records))
+    seconds = time.perf_counter() - started_at
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(result.items) == len(records)
+    return seconds / len(records) * 1_000_000, memory / len(records)
+
+
+def main() -> None:
+    cases: Dict[str, Tuple[Callable, Callable, Callable]] = {
+        'users': (make_user_rows, validated_users, records_to_users),
+        'assets': (make_assets_rows, validated_assets, records_to_assets),
+    }
+    print(f'{ROWS} rows, time includes tracemalloc overhead')
+    print(f'{"adapter":<10}{"before, us":>12}{"after, us":>12}{"before, B":>12}{"after, B":>12}')
+    for name, (make_rows, before_adapter, after_adapter) in cases.items():
+        records = make_rows()
+        before_time, before_memory = measure(before_adapter, records)
+        after_time, after_memory = measure(after_adapter, records)
+        print(
+            f'{name:<10}{before_time:>12.2f}{after_time:>12.2f}'
+            f'{before_memory:>12.0f}{after_memory:>12.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
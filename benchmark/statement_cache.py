@@ -0,0 +1,78 @@
+"""
+Measures per-call python overhead of building statements for the hot
+provider queries with and without provider statement cache. Overhead is
+building of statement and generating of its sqlalchemy cache key, which is
+done on every execution to look up compiled sql. Database is not used.
+
+Usage:
+# python -m benchmark.statement_cache
+"""
+import datetime
+import timeit
+from typing import Callable, Dict, Tuple
+
+from source.provider.assets import AssetsProvider
+from source.provider.base import BaseAlchemyModelProvider
+from source.provider.user import UsersProvider
+
+
+REPEATS = 20000
+
+
+def make_cases() -> Dict[str, Tuple[BaseAlchemyModelProvider, Callable[[BaseAlchemyModelProvider], Tuple]]]:
+    def select_assets(provider: AssetsProvider) -> Tuple:
+        return provider._get_cached_stmt(
+            ('get',),
+            lambda filters: provider._make_select_stmt(filters=filters),
+            {'tg_id': 123456789, 'type': 0}
+        )
+
+    def get_user(provider: UsersProvider) -> Tuple:
+        return provider._get_cached_stmt(
+            ('get',),
+            lambda filters: provider._make_select_stmt(filters=filters),
+            {'tg_id': 123456789}
+        )
+
+    def update_user(provider: UsersProvider) -> Tuple:
+        return provider._base_update_stmt(
+            {'tg_id': 123456789},
+            {'last_activity': datetime.datetime.now(datetime.timezone.utc)}
+        )
+
+    return {
+        'assets by tg_id + type': (AssetsProvider(), select_assets),
+        'user by tg_id': (UsersProvider(), get_user),
+        'touch user last_activity': (UsersProvider(), update_user),
+    }
+
+
+def measure(
+    provider: BaseAlchemyModelProvider,
+    build: Callable[[BaseAlchemyModelProvider], Tuple],
+    use_statement_cache: bool
+) -> float:
+    """
+    Returns mean time of one call in microseconds
+    """
+    provider._use_statement_cache = use_statement_cache
+
+    def call() -> None:
+        stmt, _ = build(provider)
+        stmt._generate_cache_key()
+
+    call()
+    seconds = timeit.timeit(call, number=REPEATS)
+    return seconds / REPEATS * 1_000_000
+
+
+def main() -> None:
+    print(f'{"query":<28}{"before, us":>14}{"after, us":>14}{"speedup":>10}')
+    for name, (provider, build) in make_cases().items():
+        before = measure(provider, build, use_statement_cache=False)
+        after = measure(provider, build, use_statement_cache=True)
+        print(f'{name:<28}{before:>14.1f}{after:>14.1f}{before / after:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
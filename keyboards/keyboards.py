@@ -3,9 +3,10 @@ from aiogram.types import ReplyKeyboardMarkup, ReplyKeyboardRemove, KeyboardButt
 # Main menu
 my_assets = KeyboardButton('/my_assets')
 crypto_price = KeyboardButton('/crypto_price')
+price_alerts = KeyboardButton('/price_alerts')
 
 main_menu = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True)
-main_menu.add(my_assets).add(crypto_price)
+main_menu.add(my_assets).add(crypto_price).add(price_alerts)
 
 
 # Assets menu
@@ -27,6 +28,14 @@ crypto_assets_menu.row(show_crypto_assets, add_crypto_assets)
 crypto_assets_menu.row(edit_crypto_assets, delete_crypto_assets)
 
 
+# Price alerts menu
+add_price_alert = KeyboardButton('/add_price_alert')
+delete_price_alert = KeyboardButton('/delete_price_alert')
+
+price_alerts_menu = ReplyKeyboardMarkup(resize_keyboard=True, one_time_keyboard=True)
+price_alerts_menu.row(add_price_alert, delete_price_alert)
+
+
 # User's keyboards
 share_num = KeyboardButton('/share_num', request_contact=True)
 where_am_i = KeyboardButton('/where_am_i', request_location=True)
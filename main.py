@@ -1,14 +1,44 @@
 from aiogram.utils import executor
 from bot import dispatcher
 from source import registrator
+from source.session import http_session, engine, replica_pool
+from source.provider.shared.instrumentation import query_instrumentation
+from source.service.prices import price_refresher
+from source.service.catalog import load_coin_catalog
+from source.service.valuation import portfolio_valuation_job
+from source.service.alerts import price_alert_service
+from source.service.user import activity_buffer
 
 
 async def on_start(_):
+    try:
+        await load_coin_catalog()
+    except Exception as e:
+        # names are validated by CoinGecko requests until catalog is loaded
+        print(f'COIN CATALOG IS NOT LOADED: {e!r}')
+    for db_engine in (engine, *replica_pool.engines):
+        query_instrumentation.listen(db_engine)
+    replica_pool.start()
+    await price_alert_service.load()
+    price_refresher.add_coin_source(lambda: price_alert_service.coin_ids)
+    price_refresher.add_listener(price_alert_service.on_prices)
+    price_refresher.start()
+    portfolio_valuation_job.start()
+    activity_buffer.start()
     print('BOT STARTED !!!')
 
 
+async def on_shutdown(_):
+    await activity_buffer.stop()
+    await portfolio_valuation_job.stop()
+    await price_refresher.stop()
+    await http_session.close()
+    await replica_pool.stop()
+
+
 registrator.register_start_handlers(dispatcher=dispatcher)
 registrator.register_assets_handlers(dispatcher=dispatcher)
+registrator.register_price_alert_handlers(dispatcher=dispatcher)
 registrator.register_admin_handlers(dispatcher=dispatcher)
 registrator.register_user_handlers(dispatcher=dispatcher)
 registrator.register_handlers_without_param(dispatcher=dispatcher)
@@ -17,5 +47,6 @@ registrator.register_handlers_without_param(dispatcher=dispatcher)
 executor.start_polling(
     dispatcher=dispatcher,
     skip_updates=True,
-    on_startup=on_start
+    on_startup=on_start,
+    on_shutdown=on_shutdown
 )
@@ -0,0 +1,31 @@
+"""assets jsonb
+
+Revision ID: 7b2e4d9f1c85
+Revises: 5e7d9c1a4b63
+Create Date: 2026-10-17 17:05:48.216390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e4d9f1c85'
+down_revision = '5e7d9c1a4b63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('assets', 'assets',
+               existing_type=sa.JSON(),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               postgresql_using='assets::jsonb')
+
+
+def downgrade():
+    op.alter_column('assets', 'assets',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=sa.JSON(),
+               postgresql_using='assets::json')
@@ -3,3 +3,4 @@ from .admin import *
 from .crypto_assets import *
 from .base_state import *
 from .assets_menu import *
+from .price_alerts import *
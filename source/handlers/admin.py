@@ -2,6 +2,9 @@ from aiogram import types
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from bot import bot
+from source.provider.base import BaseAlchemyModelProvider
+from source.provider.shared.instrumentation import query_instrumentation
+from source.service.scheduler import coingecko_scheduler
 
 
 class FSMAdmin(StatesGroup):
@@ -29,6 +32,42 @@ async def is_admin(
         await mess.reply('You are standart user')
 
 
+async def get_query_stats(
+    mess: types.Message
+):
+    """
+    /query_stats - provider query stats, slowest queries, read cache stats
+    and CoinGecko scheduler metrics,
+    /query_stats reset - the same and query stats are reset after it
+    """
+    if mess.from_user.id not in admin_iset:
+        return
+    lines = [query_instrumentation.dump() if query_instrumentation.get_stats() else 'No queries']
+    read_cache_stats = BaseAlchemyModelProvider.get_read_cache_stats()
+    if read_cache_stats:
+        lines.extend(['', 'Read caches:'])
+    for provider, stats in read_cache_stats.items():
+        lines.append(
+            f'{provider}: {stats["size"]} keys, hit ratio {stats["hit_ratio"]:.2f}, '
+            f'{stats["hits"]} hits, {stats["misses"]} misses, {stats["evictions"]} evictions'
+        )
+    metrics = coingecko_scheduler.get_metrics()
+    lines.extend([
+        '',
+        'CoinGecko scheduler:',
+        f'breaker {metrics["breaker"]}, queue {metrics["queue_depth"]["interactive"]} interactive / '
+        f'{metrics["queue_depth"]["background"]} background',
+        f'{metrics["requests"]} requests, {metrics["retries"]} retries, {metrics["throttled"]} throttled, '
+        f'{metrics["failures"]} failures, {metrics["rejected"]} rejected',
+        f'wait avg / max: {metrics["avg_wait"] * 1000:.1f} / {metrics["max_wait"] * 1000:.1f} ms',
+    ])
+    dump = '\n'.join(lines)
+    # telegram message length limit
+    await mess.reply(dump[:4096])
+    if mess.get_args() == 'reset':
+        query_instrumentation.reset()
+
+
 async def machine_state(
     mess: types.Message
 ):
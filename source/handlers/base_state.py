@@ -23,6 +23,15 @@ class FSMEditCryptoAsset(BaseCryptoFSM):
     what_to_do = 'редактировать в портфеле'
 
 
+class FSMAddPriceAlert(StatesGroup):
+    crypto_name = State()
+    threshold = State()
+
+
+class FSMDeletePriceAlert(StatesGroup):
+    alert_id = State()
+
+
 async def cancel_state(
     mess: types.Message,
     state: FSMContext
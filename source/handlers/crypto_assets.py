@@ -5,6 +5,8 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters import Command
 
 from source.service.assets import AssetsService
+from source.service import domain
+from source.provider.exception import AssetNameIncorrect, AssetPriceUnavailable
 from .base_state import BaseCryptoFSM, FSMGetCryptoPrice, FSMAddCryptoAsset, FSMEditCryptoAsset
 
 
@@ -24,10 +26,14 @@ class CryptoPriceHandler:
         state: FSMContext
     ):
         crypto_info = await self.service.get_crypto_info(crypto_name=mess.text.lower())
-        if crypto_info is None:
+        if isinstance(crypto_info, AssetNameIncorrect):
             await mess.answer('Ошибка, проверьте название монетки (например: bitcoin)')
             await state.finish()
             return crypto_info
+        if isinstance(crypto_info, AssetPriceUnavailable):
+            await mess.answer(crypto_info.detail)
+            await state.finish()
+            return crypto_info
         await mess.answer(f'Текущая цена {crypto_info.name}: {crypto_info.price}')
         await state.finish()
 
@@ -39,10 +45,15 @@ class CryptoAssetHandler:
         self,
         mess: types.Message
     ):
-        assets = await self.service.get_crypto_assets(mess.from_user.id)
-        await mess.answer('Мои активы:')
-        for crypto_name, value in assets.assets.items():
-            await mess.answer(f'{crypto_name} - {value}')
+        portfolio = await self.service.get_crypto_portfolio(mess.from_user.id)
+        lines = ['Мои активы:']
+        for item in portfolio.items:
+            if item.total is None:
+                lines.append(f'{item.name} - {item.value}')
+            else:
+                lines.append(f'{item.name} - {item.value} ({round(item.total, 2)} $)')
+        lines.append(f'Итого: {round(portfolio.total, 2)} $')
+        await mess.answer('\n'.join(lines))
 
     async def add_asset(
         self,
@@ -97,10 +108,23 @@ class CryptoAssetStateHandler:
         mess: types.Message,
         state: FSMContext,
     ):
-        await state.update_data(crypto_name=mess.text.lower())
+        coin = await self.service.resolve_coin(crypto_name=mess.text)
+        if isinstance(coin, AssetPriceUnavailable):
+            await mess.reply(coin.detail)
+            return
+        if not isinstance(coin, domain.Coin):
+            suggestions = self.service.suggest_coins(crypto_name=mess.text)
+            if suggestions:
+                names = ', '.join(coin.id for coin in suggestions)
+                await mess.reply(f'Монета не найдена, возможно вы имели в виду: {names}')
+            else:
+                await mess.reply('Монета не найдена, проверьте название (например: bitcoin)')
+            return
+
+        await state.update_data(crypto_name=coin.id)
 
         await self.current_fsm.value.set()
-        await mess.reply(f'Введите количество {mess.text}')
+        await mess.reply(f'Введите количество {coin.name}')
 
     async def save_asset_value_in_state_data(
         self,
@@ -0,0 +1,112 @@
+from aiogram import types
+from aiogram.dispatcher import FSMContext
+
+from bot import bot
+from keyboards import price_alerts_menu
+from source.service import domain
+from source.service.alerts import PriceAlertService
+from source.provider.exception import AssetPriceUnavailable
+from .base_state import FSMAddPriceAlert, FSMDeletePriceAlert
+
+
+_directions = {
+    domain.AlertDirection.ABOVE: 'выше',
+    domain.AlertDirection.BELOW: 'ниже',
+}
+
+
+async def notify_price_alert(
+    alert: domain.PriceAlert,
+    price: float
+):
+    await bot.send_message(
+        alert.tg_id,
+        f'Цена {alert.coin_id} {_directions[alert.direction]} {alert.threshold}: {price}'
+    )
+
+
+class PriceAlertHandler:
+    service = PriceAlertService()
+
+    async def get_alerts(
+        self,
+        mess: types.Message
+    ):
+        alerts = await self.service.get_alerts(tg_id=mess.from_user.id)
+        lines = ['Мои оповещения:']
+        for alert in alerts.items:
+            lines.append(f'#{alert.id} {alert.coin_id} {_directions[alert.direction]} {alert.threshold}')
+        await mess.answer('\n'.join(lines), reply_markup=price_alerts_menu)
+
+    async def add_alert_state_starter(
+        self,
+        mess: types.Message
+    ):
+        await FSMAddPriceAlert.crypto_name.set()
+        await mess.reply('Введите название криптовалюты (например: bitcoin)')
+
+    async def save_alert_name_in_state_data(
+        self,
+        mess: types.Message,
+        state: FSMContext
+    ):
+        coin = await self.service.resolve_coin(crypto_name=mess.text)
+        if isinstance(coin, AssetPriceUnavailable):
+            await mess.reply(coin.detail)
+            return
+        if not isinstance(coin, domain.Coin):
+            await mess.reply('Монета не найдена, проверьте название (например: bitcoin)')
+            return
+
+        await state.update_data(crypto_name=coin.id)
+        await FSMAddPriceAlert.next()
+        await mess.reply(f'Введите цену {coin.name}, при пересечении которой придет оповещение')
+
+    async def add_alert(
+        self,
+        mess: types.Message,
+        state: FSMContext
+    ):
+        try:
+            threshold = float(mess.text.replace(',', '.'))
+        except ValueError:
+            await mess.reply('Введите число (например: 2000)')
+            return
+
+        data = await state.get_data()
+        alert = await self.service.add_alert(
+            tg_id=mess.from_user.id,
+            crypto_name=data['crypto_name'],
+            threshold=threshold
+        )
+        await state.finish()
+        if not isinstance(alert, domain.PriceAlert):
+            await mess.answer(alert.detail)
+            return
+        await mess.answer(f'Оповещение #{alert.id} добавлено: '
+                          f'{alert.coin_id} {_directions[alert.direction]} {alert.threshold}')
+
+    async def delete_alert_state_starter(
+        self,
+        mess: types.Message
+    ):
+        await FSMDeletePriceAlert.alert_id.set()
+        await mess.reply('Введите номер оповещения (например: 12)')
+
+    async def delete_alert(
+        self,
+        mess: types.Message,
+        state: FSMContext
+    ):
+        try:
+            alert_id = int(mess.text.lstrip('#'))
+        except ValueError:
+            await mess.reply('Введите номер оповещения (например: 12)')
+            return
+
+        deleted = await self.service.delete_alert(tg_id=mess.from_user.id, alert_id=alert_id)
+        await state.finish()
+        if deleted:
+            await mess.answer(f'Оповещение #{alert_id} удалено')
+        else:
+            await mess.answer(f'Оповещение #{alert_id} не найдено')
@@ -0,0 +1,13 @@
+from .base import BaseAlchemyModelProvider
+from . import serializer
+from . import models as orm_models
+
+
+class PriceAlertsProvider(BaseAlchemyModelProvider):
+
+    _mapper = orm_models.PriceAlerts
+
+    _sorting_columns = ('id', 'tg_id', 'coin_id')
+
+    _single_record_adapter = staticmethod(serializer.record_to_price_alert)
+    _multiple_records_adapter = staticmethod(serializer.records_to_price_alerts)
@@ -1,19 +1,27 @@
 from typing import (
-    Dict, Callable, Union, Optional, Mapping, Iterable, Any, Type, Tuple, List, Sequence
+    AsyncIterator, Awaitable, Dict, Callable, Union, Optional, Mapping, Iterable, Any, Type, Tuple, List, Sequence
 )
 import orjson as json
 from sqlalchemy import (
-    Table, Column, and_, any_, select, insert, update, delete, func, nullslast
+    Table, Column, Boolean, Index, PrimaryKeyConstraint, UniqueConstraint, and_, any_, bindparam,
+    cast, column, literal, literal_column, select, insert, update, delete, func, nullslast,
+    values as values_clause
 )
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import Select, Insert, Update, Delete, distinct
-from sqlalchemy.sql.expression import BinaryExpression, or_
+from sqlalchemy.sql.elements import BindParameter
+from sqlalchemy.sql.expression import BinaryExpression, Executable, or_
 from sqlalchemy.sql.selectable import Alias
 from sqlalchemy_utils.functions import get_primary_keys
 
+from settings import settings
 from source.service import domain
-from source.session import async_session
+from source.session import UnitOfWork, unit_of_work, get_unit_of_work, read_only_session
+from .shared.cache import VersionedCache
+from .shared.instrumentation import query_instrumentation
 from .shared.utils import clear_from_ellipsis
 from . import models as orm_models
 
@@ -223,7 +231,7 @@ class AlchemyFilters:
         # Handle if value passed as self.ALL_OBJECTS_FILTER
         # it forms expression like field != None
         # TODO wrong logic
-        if value == self.ALL_OBJECTS_FILTER:
+        if not isinstance(value, BindParameter) and value == self.ALL_OBJECTS_FILTER:
             operator_name = self.NOT_EQUAL_OPERATOR
             value = None
 
@@ -255,6 +263,48 @@ class AlchemyFilters:
             E.append(e)
         return and_(*E)
 
+    def parametrize(
+        self,
+        filters: Mapping[str, Any],
+        bound_filters: Dict[str, Any],
+        params: Dict[str, Any]
+    ) -> Optional[Tuple]:
+        """
+        Copies filters to bound_filters with values replaced by bind parameters
+        and puts values to params, so clause built by bound_filters is the same
+        for any values and can be reused.
+        Returns shape of filters i.e. lookups with nested shapes, None and
+        ALL_OBJECTS_FILTER values, which are built as literals.
+        Returns None if any lookup is handled by method of Filters class,
+        such clause depends on value and can't be reused
+        """
+        shape = []
+        for lookup, value in filters.items():
+            column_name, *_ = lookup.split(self.LOOKUP_STRING)
+            operator_name = self.EQUAL_OPERATOR
+            if self.LOOKUP_STRING in lookup:
+                *_, operator_name = lookup.split(self.LOOKUP_STRING)
+            if getattr(self, lookup, None) is not None or getattr(self, column_name, None) is not None:
+                return None
+
+            if isinstance(value, Mapping):
+                nested_filters: Dict[str, Any] = {}
+                nested_shape = self.parametrize(value, nested_filters, params)
+                if nested_shape is None:
+                    return None
+                bound_filters[lookup] = nested_filters
+                shape.append((lookup, nested_shape))
+            elif value is None or (isinstance(value, str) and value == self.ALL_OBJECTS_FILTER):
+                bound_filters[lookup] = value
+                shape.append((lookup, value))
+            else:
+                name = f'filter_{len(params)}'
+                expanding = operator_name in (self.IN_OPERATOR, self.NOT_IN_OPERATOR)
+                bound_filters[lookup] = bindparam(name, expanding=expanding)
+                params[name] = value
+                shape.append((lookup,))
+        return tuple(shape)
+
 
 class BaseAlchemyModelProvider:
     """
@@ -282,6 +332,13 @@ class BaseAlchemyModelProvider:
     _first_pk_column_name is optional str which is name of _mapper first
     primary key column name. Default is 'id' and it gets from _mapper dynamically
 
+    _returning_full_row is optional flag. If it's True insert and update
+    statements return all table columns and returned row is passed to
+    _single_record_adapter, so write takes one round trip. If it's False they
+    return first pk value and object is got by get method. Default is True,
+    it has to be turned off if _single_record_adapter needs data which
+    table row doesn't contain
+
     _sorting_columns is required iterable object of str. It contains names of
     _mapper columns to make order by them.
 
@@ -292,10 +349,34 @@ class BaseAlchemyModelProvider:
     _multiple_records_adapter is required async callable object to adapt
     multiple orm models objects to another type object. It uses in select
 
+    Every method runs in current unit of work (source.session.unit_of_work),
+    if there is no started unit of work, method starts its own one, which
+    commits when method returns. Reads start read only unit of work, which
+    goes to read replica if there is one in rotation, reads inside unit of
+    work with writes use its primary session
+
+    _statement_cache is shared cache of built statements. Statements are built
+    with bind parameters instead of filter values and are cached by provider
+    class, operation, filters shape and order, limit and offset flags, so
+    calls with the same filters shape reuse statement and its compiled sql.
+    _use_statement_cache is optional flag to turn caching off in subclasses
+
+    _read_cache_ttl is optional seconds to cache adapted objects returned by
+    get, cache is off if it's None. Objects are cached by normalized filters
+    in VersionedCache of provider class with _read_cache_max_size keys.
+    Cached objects are shared, so they must not be mutated.
+    Every write through provider methods sets new version of written rows,
+    right away and after commit, so objects of written rows are not returned
+    from cache anymore. Rows are identified by _read_cache_row_key column,
+    default is first pk column.
+    Objects read inside unit of work with writes are not cached
+
+    Every _do_* method is measured by query_instrumentation
+    (source.provider.shared.instrumentation): latency, rows and errors are
+    counted per provider class and operation, slowest statements are kept
+    with shapes of their filters
     """
 
-    session: AsyncSession
-
     _mapper: Type[orm_models.ORMBaseModel]
     _usage_mappers: Optional[Tuple[Type[orm_models.ORMBaseModel]]] = None
 
@@ -309,6 +390,7 @@ class BaseAlchemyModelProvider:
     _delete_stmt: Optional[Delete] = None
 
     _first_pk_column_name: Optional[str] = None
+    _returning_full_row: bool = True
 
     _sorting_columns: Tuple[str]
 
@@ -317,6 +399,13 @@ class BaseAlchemyModelProvider:
 
     _does_not_exist_exception: Optional[str] = 'Object Does Not Exist'
 
+    _statement_cache: Dict[Tuple, Executable] = {}
+    _use_statement_cache: bool = True
+
+    _read_caches: Dict[Type, VersionedCache] = {}
+    _read_cache_ttl: Optional[float] = None
+    _read_cache_max_size: int = settings.PROVIDER_READ_CACHE_MAX_SIZE
+    _read_cache_row_key: Optional[str] = None
 
     class Filters(AlchemyFilters):
         """
@@ -330,6 +419,16 @@ class BaseAlchemyModelProvider:
         except AttributeError:
             raise Exception('Attribute Must Be Set Exception')
 
+    @property
+    def session(self) -> AsyncSession:
+        """
+        Returns session of current unit of work
+        """
+        uow = get_unit_of_work()
+        if uow is None:
+            raise Exception('Unit Of Work Is Not Started Exception')
+        return uow.session
+
     def _get_table(
         self,
         reference_name: Optional[str] = None
@@ -449,12 +548,195 @@ class BaseAlchemyModelProvider:
         """
         Initializes provider object and bind it Filters object
         """
-        self.session = async_session
         self._filters = self.Filters()
         self._filters._mapper = self._get_mapper
         self._filters._table = self._get_table()
         self._filters._joined_aliases = self._get_usage_aliases
 
+    def _get_cached_stmt(
+        self,
+        key: Tuple,
+        build: Callable[[Mapping], Executable],
+        filters: Mapping = {}
+    ) -> Tuple[Executable, Dict[str, Any]]:
+        """
+        Returns statement built by build(filters) and params to execute it.
+        If filters can be parametrized, statement is built by filters with
+        bind parameters once and is taken from self._statement_cache by key
+        and filters shape next time
+        """
+        if not self._use_statement_cache:
+            return build(filters), {}
+
+        bound_filters: Dict[str, Any] = {}
+        params: Dict[str, Any] = {}
+        shape = self._filters.parametrize(filters, bound_filters, params)
+        if shape is None:
+            return build(filters), {}
+
+        cache_key = (type(self), *key, shape)
+        stmt = self._statement_cache.get(cache_key)
+        if stmt is None:
+            stmt = build(bound_filters)
+            if len(self._statement_cache) < settings.PROVIDER_STATEMENT_CACHE_SIZE:
+                self._statement_cache[cache_key] = stmt
+        return stmt, params
+
+    @property
+    def _read_cache(self) -> Optional[VersionedCache]:
+        if self._read_cache_ttl is None:
+            return None
+        cache = self._read_caches.get(type(self))
+        if cache is None:
+            cache = self._read_caches[type(self)] = VersionedCache(
+                ttl=self._read_cache_ttl,
+                max_size=self._read_cache_max_size,
+                # reads may go to replica, which lags at most by max lag
+                settle_time=settings.SQLALCHEMY_REPLICA_MAX_LAG if settings.SQLALCHEMY_REPLICA_URLS else 0
+            )
+        return cache
+
+    @classmethod
+    def get_read_cache_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns read cache stats of every provider class with read cache
+        """
+        return {
+            provider.__name__: {**cache.stats.as_dict(), 'size': len(cache)}
+            for provider, cache in cls._read_caches.items()
+        }
+
+    @property
+    def _get_read_cache_row_key(self) -> str:
+        if self._read_cache_row_key is None:
+            return self._get_first_pk_column_name
+        return self._read_cache_row_key
+
+    def _make_read_cache_key(
+        self,
+        operation: str,
+        filters: Mapping
+    ) -> Optional[Tuple]:
+        """
+        Returns filters as sorted tuple of lookups with explicit operators
+        and values, so equal filters written differently have the same key,
+        e.g. {'tg_id': 1, 'type': 0} and {'type__e': 0, 'tg_id__e': 1}.
+        Returns None if any value is unhashable
+        """
+        items = []
+        for lookup, value in filters.items():
+            if self._filters.LOOKUP_STRING not in lookup:
+                lookup = lookup + self._filters.LOOKUP_STRING + self._filters.EQUAL_OPERATOR
+            if isinstance(value, Mapping):
+                value = self._make_read_cache_key(lookup, value)
+                if value is None:
+                    return None
+            elif isinstance(value, (list, tuple)):
+                value = tuple(value)
+            elif isinstance(value, set):
+                value = frozenset(value)
+            try:
+                hash(value)
+            except TypeError:
+                return None
+            items.append((lookup, value))
+        return (operation, tuple(sorted(items, key=repr)))
+
+    async def _cached_read(
+        self,
+        key: Optional[Tuple],
+        fetch: Callable[[], Awaitable[Tuple[Any, Any]]]
+    ) -> Any:
+        """
+        Returns object by key from read cache or awaits fetch(), which
+        returns row key value and object, and caches object.
+        Object is not cached if key is None, if row key value is None, if
+        it's read in unit of work with writes, which may be rolled back, or
+        if row was written less than SQLALCHEMY_REPLICA_MAX_LAG seconds ago
+        while replicas are used, since object may be read from lagging replica
+        """
+        cache = self._read_cache
+        if cache is None or key is None:
+            _, value = await fetch()
+            return value
+
+        value = cache.get(key, default=...)
+        if value is not ...:
+            return value
+
+        tag = cache.tag
+        row_key, value = await fetch()
+        uow = get_unit_of_work()
+        if row_key is not None and (uow is None or uow.read_only):
+            cache.set(key, row_key, tag, value)
+        return value
+
+    def _get_record_row_keys(
+        self,
+        records: Iterable[Any]
+    ) -> Optional[List[Any]]:
+        """
+        Returns row key values of written records, which are full rows if
+        self._returning_full_row, otherwise first pk values.
+        Returns None if row keys can't be got from records
+        """
+        row_key = self._get_read_cache_row_key
+        if self._returning_full_row:
+            return [getattr(record, row_key) for record in records if record is not None]
+        if row_key != self._get_first_pk_column_name:
+            return None
+        return [record for record in records if record is not None]
+
+    def _invalidate_read_cache(
+        self,
+        uow: UnitOfWork,
+        row_keys: Optional[Iterable[Any]]
+    ) -> None:
+        """
+        Sets new version of written rows now and after commit of uow, so
+        objects read by concurrent calls before commit are not returned too.
+        If row_keys is None, whole cache of provider is invalidated
+        """
+        cache = self._read_cache
+        if cache is None:
+            return
+
+        if row_keys is None:
+            cache.invalidate_all()
+            uow.after_commit(cache.invalidate_all)
+            return
+
+        row_keys = list(row_keys)
+        if not row_keys:
+            return
+        cache.invalidate(row_keys)
+        uow.after_commit(lambda: cache.invalidate(row_keys))
+
+    def _get_conflict_columns(
+        self,
+        column_names: Iterable[str]
+    ) -> Optional[Tuple[str]]:
+        """
+        Returns columns of primary key, unique constraint or unique index of
+        table which columns are all in column_names. Constraints with less
+        columns go first. Returns None if there is no such constraint
+        """
+        column_names = set(column_names)
+        table = self._get_table()
+        unique_columns = [
+            tuple(c.name for c in constraint.columns)
+            for constraint in table.constraints
+            if isinstance(constraint, (PrimaryKeyConstraint, UniqueConstraint))
+        ]
+        unique_columns.extend(
+            tuple(c.name for c in index.columns)
+            for index in table.indexes if index.unique
+        )
+        for conflict_columns in sorted(unique_columns, key=lambda columns: (len(columns), columns)):
+            if conflict_columns and set(conflict_columns) <= column_names:
+                return conflict_columns
+        return None
+
     def _bind_order_limit_offset_to_stmt(
         self,
         select_stmt: Select,
@@ -521,8 +803,11 @@ class BaseAlchemyModelProvider:
         stmt: Union[Insert, Update]
     ) -> Union[Insert, Update]:
         """
-        Adds returning statement to insert or update statement which will return mapper first pk value
+        Adds returning statement to insert or update statement which will return
+        all table columns if self._returning_full_row else mapper first pk value
         """
+        if self._returning_full_row:
+            return stmt.returning(*self._get_table().columns)
         first_pk_column = self._get_first_pk_column
         return stmt.returning(first_pk_column)
 
@@ -530,22 +815,31 @@ class BaseAlchemyModelProvider:
         self,
         filters = {},
         values = {}
-    ) -> Union[Update, Select]:
+    ) -> Tuple[Union[Update, Select], Dict[str, Any]]:
         """
-        Builds necessary statement for using it in update methods
+        Builds necessary statement for using it in update methods and returns
+        it with params. Values are passed as bind parameters named
+        'value_' + column name
         """
-        update_stmt = self._update_stmt
-        if not update_stmt:
-            update_stmt = update(self._get_mapper)
+        def build(bound_filters: Mapping) -> Update:
+            update_stmt = self._update_stmt
+            if not update_stmt:
+                update_stmt = update(self._get_mapper)
 
-        where_clause = self._filters.build_where_clause(filters=filters)
-        update_stmt = update_stmt.values(**values)
-        update_stmt = update_stmt.where(where_clause)
+            where_clause = self._filters.build_where_clause(filters=bound_filters)
+            update_stmt = update_stmt.values(**{
+                column_name: bindparam('value_' + column_name) for column_name in values
+            })
+            update_stmt = update_stmt.where(where_clause)
 
-        update_stmt = self._form_returning_stmt(stmt=update_stmt)
+            return self._form_returning_stmt(stmt=update_stmt)
 
-        return update_stmt
+        update_stmt, params = self._get_cached_stmt(('update', *values), build, filters)
+        for column_name, value in values.items():
+            params['value_' + column_name] = value
+        return update_stmt, params
 
+    @query_instrumentation.instrumented('select')
     async def _do_select(
         self,
         order_by: str = None,
@@ -557,16 +851,32 @@ class BaseAlchemyModelProvider:
         """
         Executes built select stmt in self.session and returns answer
         """
-        stmt = self._make_select_stmt(
-            order_by=order_by,
-            order_reversed=order_reversed,
-            limit=limit,
-            offset=offset,
-            filters=filters
+        has_limit, has_offset = type(limit) == int, type(offset) == int
+
+        def build(bound_filters: Mapping) -> Select:
+            stmt = self._make_select_stmt(
+                order_by=order_by,
+                order_reversed=order_reversed,
+                filters=bound_filters
+            )
+            if has_limit:
+                stmt = stmt.limit(bindparam('limit'))
+            if has_offset:
+                stmt = stmt.offset(bindparam('offset'))
+            return stmt
+
+        stmt, params = self._get_cached_stmt(
+            ('select', order_by, order_reversed, has_limit, has_offset), build, filters
         )
+        if has_limit:
+            params['limit'] = limit
+        if has_offset:
+            params['offset'] = offset
 
-        return (await self.session.execute(stmt)).all()
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt, params)).all()
 
+    @query_instrumentation.instrumented('select_count')
     async def _do_select_count(
         self,
         filters: Union[Mapping, List] = {}
@@ -575,35 +885,46 @@ class BaseAlchemyModelProvider:
         Executing build select count stmt in self.session and
         return answer
         """
-        stmt = self._select_count_stmt
-        if stmt is None:
-            stmt = select(func.count(distinct(self._get_first_pk_column))).select_from(self._get_mapper)
+        def build(bound_filters: Mapping) -> Select:
+            stmt = self._select_count_stmt
+            if stmt is None:
+                stmt = select(func.count(distinct(self._get_first_pk_column))).select_from(self._get_mapper)
 
-        where_clause = self._filters.build_where_clause(filters=filters)
-        stmt = stmt.where(where_clause)
+            where_clause = self._filters.build_where_clause(filters=bound_filters)
+            return stmt.where(where_clause)
+
+        stmt, params = self._get_cached_stmt(('select_count',), build, filters)
 
-        return await self.session.scalar(stmt)
+        async with unit_of_work(read_only=True) as uow:
+            return await uow.session.scalar(stmt, params)
 
+    @query_instrumentation.instrumented('get')
     async def _do_get(
         self,
         filters: Union[Mapping, List] = {}
     ):
         """
         """
-        stmt = self._select_stmt
-        if stmt is None:
-            stmt = select(self._get_mapper)
-        where_clause = self._filters.build_where_clause(filters=filters)
-        stmt = stmt.where(where_clause)
+        def build(bound_filters: Mapping) -> Select:
+            stmt = self._select_stmt
+            if stmt is None:
+                stmt = select(self._get_mapper)
+            where_clause = self._filters.build_where_clause(filters=bound_filters)
+            return stmt.where(where_clause)
+
+        stmt, params = self._get_cached_stmt(('get',), build, filters)
 
-        return (await self.session.execute(stmt)).first()
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt, params)).first()
 
+    @query_instrumentation.instrumented('insert')
     async def _do_insert(
         self,
         **values
-    ) -> Union[str, int]:
+    ) -> Union[Row, str, int]:
         """
-        Does insert and returns value of first pk column in table
+        Does insert and returns inserted row if self._returning_full_row
+        else value of first pk column in table
         """
         insert_stmt = self._insert_stmt
         if insert_stmt is None:
@@ -612,43 +933,203 @@ class BaseAlchemyModelProvider:
         insert_stmt = insert_stmt.values(**values)
 
         insert_stmt = self._form_returning_stmt(stmt=insert_stmt)
-        result = await self.session.scalar(insert_stmt)
-        await self.session.commit()
-        return result
+        async with unit_of_work() as uow:
+            if self._returning_full_row:
+                record = (await uow.session.execute(insert_stmt)).first()
+            else:
+                record = await uow.session.scalar(insert_stmt)
+            self._invalidate_read_cache(uow, self._get_record_row_keys([record]))
+            return record
 
+    @query_instrumentation.instrumented('update')
     async def _do_update(
         self,
         filters,
         values
-    ) -> Union[int, str]:
+    ) -> Union[Row, int, str, None]:
         """
-        This method expects only one row to update and returns the row if this necessary
+        This method expects only one row to update and returns the row if
+        self._returning_full_row else value of first pk column of the row.
+        Returns None if no row was updated
         """
-        stmt = self._base_update_stmt(filters, values)
+        stmt, params = self._base_update_stmt(filters, values)
 
         # something went wrong, we couldn't find any solutions then `execution_options={"synchronize_session": False}`
         # see more in https://stackoverflow.com/questions/51221686/sqlalchemy-cannot-evaluate-binaryexpression-with-operator
 
-        result = await self.session.scalar(stmt, execution_options={"synchronize_session": False})
-        await self.session.commit()
-        return result
+        async with unit_of_work() as uow:
+            if self._returning_full_row:
+                result = await uow.session.execute(stmt, params, execution_options={"synchronize_session": False})
+                record = result.first()
+            else:
+                record = await uow.session.scalar(stmt, params, execution_options={"synchronize_session": False})
+            self._invalidate_read_cache(uow, self._get_record_row_keys([record]))
+            return record
 
+    @query_instrumentation.instrumented('delete')
     async def _do_delete(
         self,
         filters: Union[Mapping, List] = {}
     ) -> None:
         """
         """
+        def build(bound_filters: Mapping) -> Delete:
+            stmt = self._delete_stmt
+            if stmt is None:
+                stmt = delete(self._get_mapper)
+
+            where_clause = self._filters.build_where_clause(filters=bound_filters)
+            stmt = stmt.where(where_clause)
+            if self._read_cache is not None:
+                stmt = stmt.returning(self._get_column(self._get_read_cache_row_key))
+            return stmt
+
+        stmt, params = self._get_cached_stmt(('delete',), build, filters)
+
+        # something went wrong, we couldn't find any solutions then `execution_options={"synchronize_session": False}`
+        # see more in https://stackoverflow.com/questions/51221686/sqlalchemy-cannot-evaluate-binaryexpression-with-operator
+        async with unit_of_work() as uow:
+            result = await uow.session.execute(stmt, params, execution_options={"synchronize_session": False})
+            if self._read_cache is not None:
+                self._invalidate_read_cache(uow, result.scalars().all())
+
+    @query_instrumentation.instrumented('insert_many')
+    async def _do_insert_many(
+        self,
+        values_list: List[Dict[str, Any]]
+    ) -> List[Union[Row, str, int]]:
+        """
+        Inserts rows by multi-row insert statements with settings.PROVIDER_BULK_CHUNK_SIZE
+        rows each and returns inserted rows if self._returning_full_row else
+        values of first pk column
+        """
+        insert_stmt = self._insert_stmt
+        if insert_stmt is None:
+            insert_stmt = insert(self._get_mapper)
+
+        records: List[Union[Row, str, int]] = []
+        async with unit_of_work() as uow:
+            for i in range(0, len(values_list), settings.PROVIDER_BULK_CHUNK_SIZE):
+                stmt = insert_stmt.values(values_list[i:i + settings.PROVIDER_BULK_CHUNK_SIZE])
+                stmt = self._form_returning_stmt(stmt=stmt)
+                if self._returning_full_row:
+                    records.extend((await uow.session.execute(stmt)).all())
+                else:
+                    records.extend((await uow.session.scalars(stmt)).all())
+            self._invalidate_read_cache(uow, self._get_record_row_keys(records))
+        return records
+
+    @query_instrumentation.instrumented('update_many')
+    async def _do_update_many(
+        self,
+        values_list: List[Dict[str, Any]],
+        key: str,
+        returning: bool = True
+    ) -> Union[List[Union[Row, str, int]], int]:
+        """
+        Updates rows by statements like
+        UPDATE table SET column = new_values.column
+        FROM (VALUES (...), (...)) AS new_values (key, column)
+        WHERE table.key = new_values.key
+        Every value is cast to column type, otherwise postgres takes values
+        of VALUES list as text.
+        Returns updated rows if self._returning_full_row else values of first pk column.
+        If returning is False nothing is returned by statements and method
+        returns number of updated rows
+        """
+        table = self._get_table()
+        column_names = list(values_list[0])
+        columns = [self._get_column(column_name) for column_name in column_names]
+
+        records: List[Union[Row, str, int]] = []
+        updated = 0
+        async with unit_of_work() as uow:
+            for i in range(0, len(values_list), settings.PROVIDER_BULK_CHUNK_SIZE):
+                new_values = values_clause(
+                    *[column(c.name, c.type) for c in columns],
+                    name='new_values'
+                ).data([
+                    tuple(cast(literal(values[c.name], c.type), c.type) for c in columns)
+                    for values in values_list[i:i + settings.PROVIDER_BULK_CHUNK_SIZE]
+                ])
+                stmt = update(table).where(
+                    table.c[key] == new_values.c[key]
+                ).values({
+                    column_name: new_values.c[column_name]
+                    for column_name in column_names if column_name != key
+                })
+                if not returning:
+                    result = await uow.session.execute(stmt, execution_options={"synchronize_session": False})
+                    updated += result.rowcount
+                    continue
+                stmt = self._form_returning_stmt(stmt=stmt)
+                if self._returning_full_row:
+                    records.extend((await uow.session.execute(stmt)).all())
+                else:
+                    records.extend((await uow.session.scalars(stmt)).all())
+            if not returning:
+                row_keys = [values[key] for values in values_list] if key == self._get_read_cache_row_key else None
+            else:
+                row_keys = self._get_record_row_keys(records)
+            self._invalidate_read_cache(uow, row_keys)
+        if not returning:
+            return updated
+        return records
+
+    @query_instrumentation.instrumented('delete_many')
+    async def _do_delete_many(
+        self,
+        filters_list: List[Mapping]
+    ) -> List[Row]:
+        """
+        Deletes rows which satisfy any of filters by one statement and returns
+        deleted rows
+        """
         stmt = self._delete_stmt
         if stmt is None:
             stmt = delete(self._get_mapper)
 
-        where_clause = self._filters.build_where_clause(filters=filters)
-        stmt = stmt.where(where_clause)
+        where_clause = or_(*[
+            self._filters.build_where_clause(filters=filters) for filters in filters_list
+        ])
+        stmt = stmt.where(where_clause).returning(*self._get_table().columns)
 
-        # something went wrong, we couldn't find any solutions then `execution_options={"synchronize_session": False}`
-        # see more in https://stackoverflow.com/questions/51221686/sqlalchemy-cannot-evaluate-binaryexpression-with-operator
-        await self.session.execute(stmt, execution_options={"synchronize_session": False})
+        async with unit_of_work() as uow:
+            records = (await uow.session.execute(stmt, execution_options={"synchronize_session": False})).all()
+            row_key = self._get_read_cache_row_key
+            self._invalidate_read_cache(uow, [getattr(record, row_key) for record in records])
+            return records
+
+    @query_instrumentation.instrumented('upsert')
+    async def _do_upsert(
+        self,
+        values: Dict[str, Any],
+        update_values: Dict[str, Any],
+        conflict_columns: Sequence[str]
+    ) -> Row:
+        """
+        Executes INSERT ... ON CONFLICT (conflict_columns) DO UPDATE ... RETURNING
+        and returns row with all table columns and inserted column, which is
+        True if row was inserted. xmax of just inserted row is 0.
+        If update_values are empty conflict columns are set to themselves, so
+        existing row is returned too
+        """
+        table = self._get_table()
+        stmt = pg_insert(table).values(**values)
+        if not update_values:
+            update_values = {column_name: stmt.excluded[column_name] for column_name in conflict_columns}
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(conflict_columns),
+            set_=update_values
+        ).returning(
+            *table.columns,
+            literal_column('xmax = 0', Boolean).label('inserted')
+        )
+
+        async with unit_of_work() as uow:
+            record = (await uow.session.execute(stmt)).first()
+            self._invalidate_read_cache(uow, [getattr(record, self._get_read_cache_row_key)])
+            return record
 
     async def select(
         self,
@@ -704,7 +1185,8 @@ class BaseAlchemyModelProvider:
                 by_column = by_column.desc() if order_reversed else by_column.asc()
             stmt = stmt.order_by(by_column)
 
-        return (await self.session.execute(stmt)).all()
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt)).all()
 
     async def get(
         self,
@@ -717,12 +1199,17 @@ class BaseAlchemyModelProvider:
         if not filters:
             raise Exception('Filters Must Be Passed Exception')
 
-        record = await self._do_get(filters=filters)
+        async def fetch() -> Tuple[Any, Any]:
+            record = await self._do_get(filters=filters)
+
+            if not record:
+                raise Exception(self._does_not_exist_exception)
 
-        if not record:
-            raise Exception(self._does_not_exist_exception)
+            row_key = getattr(record[0], self._get_read_cache_row_key, None)
+            return row_key, await self._get_single_record_adapter(*record)
 
-        return await self._get_single_record_adapter(*record)
+        key = self._make_read_cache_key('get', filters) if self._read_cache is not None else None
+        return await self._cached_read(key, fetch)
 
     async def get_row(
         self,
@@ -737,23 +1224,29 @@ class BaseAlchemyModelProvider:
             select_columns.append(self._get_column(column_name))
         where_clause = self._filters.build_where_clause(filters=filters)
         stmt = select(*select_columns).where(where_clause)
-        return (await self.session.execute(stmt)).first()
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt)).first()
 
     async def insert(
         self,
         **values
     ):
         """
-        Makes insert and returns self.get
+        Makes insert and returns adapted inserted row or self.get
         """
         values = clear_from_ellipsis(values)
 
+        if self._returning_full_row:
+            record: Row = await self._do_insert(**values)
+            return await self._get_single_record_adapter(record)
+
         first_pk_column_name: str = self._get_first_pk_column_name
-        record_pk_value: Union[int, str] = await self._do_insert(**values)
+        async with unit_of_work():
+            record_pk_value: Union[int, str] = await self._do_insert(**values)
 
-        return await self.get(
-            filters={first_pk_column_name + '__e': record_pk_value}
-        )
+            return await self.get(
+                filters={first_pk_column_name + '__e': record_pk_value}
+            )
 
     async def get_or_insert(
         self,
@@ -762,7 +1255,9 @@ class BaseAlchemyModelProvider:
         """
         Can accept only values with column which are not unique or pk,
         Tries to find row table with passed values params if such row does not exist
-        then insert new row with passed values params
+        then insert new row with passed values params.
+        If values contain all columns of unique constraint it's done by one
+        upsert statement, else by get and insert
         """
         values = clear_from_ellipsis(values)
         for column_name, value in values.items():
@@ -770,10 +1265,15 @@ class BaseAlchemyModelProvider:
             if column.unique:
                 raise Exception('Column Is Unique Exception')
 
-        try:
-            return await self.get(filters={**values})
-        except:
-            return await self.insert(**values)
+        if self._get_conflict_columns(values) is not None:
+            record, _ = await self.upsert(values)
+            return record
+
+        async with unit_of_work():
+            try:
+                return await self.get(filters={**values})
+            except Exception:
+                return await self.insert(**values)
 
     async def update(
         self,
@@ -806,12 +1306,19 @@ class BaseAlchemyModelProvider:
         if not values:
             return await self.get(filters=filters)
 
+        if self._returning_full_row:
+            record: Optional[Row] = await self._do_update(filters, values)
+            if not record:
+                raise Exception(self._does_not_exist_exception)
+            return await self._get_single_record_adapter(record)
+
         first_pk_column_name: str = self._get_first_pk_column_name
-        record_pk_value: Union[int, str] = await self._do_update(filters, values)
+        async with unit_of_work():
+            record_pk_value: Union[int, str] = await self._do_update(filters, values)
 
-        return await self.get(
-            filters={ first_pk_column_name: record_pk_value }
-        )
+            return await self.get(
+                filters={ first_pk_column_name: record_pk_value }
+            )
 
     async def update_or_insert(
         self,
@@ -841,10 +1348,29 @@ class BaseAlchemyModelProvider:
         if not filters:
             raise Exception('Filters Must Be Passed Exception')
 
-        try:
-            return await self.update(**kwargs)
-        except:
-            return await self.insert(**values)
+        # Equality filters are values of row to insert, if they contain all
+        # columns of unique constraint it's done by one upsert statement
+        equal_suffix = self._filters.LOOKUP_STRING + self._filters.EQUAL_OPERATOR
+        insert_values: Dict[str, Any] = dict()
+        for lookup, value in filters.items():
+            column_name = lookup[:-len(equal_suffix)] if lookup.endswith(equal_suffix) else lookup
+            if self._filters.LOOKUP_STRING in column_name:
+                insert_values = {}
+                break
+            insert_values[column_name] = value
+        if insert_values and values and self._get_conflict_columns(insert_values) is not None:
+            record, _ = await self.upsert(
+                {**insert_values, **values},
+                update_values=values,
+                conflict_columns=self._get_conflict_columns(insert_values)
+            )
+            return record
+
+        async with unit_of_work():
+            try:
+                return await self.update(**kwargs)
+            except Exception:
+                return await self.insert(**values)
 
     async def delete(
         self,
@@ -859,3 +1385,177 @@ class BaseAlchemyModelProvider:
             raise Exception('Filters Must Be Passed Exception')
 
         await self._do_delete(filters=filters)
+
+    async def insert_many(
+        self,
+        values_list: List[Dict[str, Any]]
+    ):
+        """
+        Inserts rows in one transaction and returns them adapted by
+        self._multiple_records_adapter. All values dicts must have the same keys
+        """
+        values_list = [clear_from_ellipsis(values) for values in values_list]
+        if not values_list:
+            return await self._get_multiple_records_adapter([])
+
+        async with unit_of_work():
+            records = await self._do_insert_many(values_list)
+            if not self._returning_full_row:
+                return await self.select(
+                    filters={self._get_first_pk_column_name + '__in': records}
+                )
+
+        return await self._get_multiple_records_adapter([(record,) for record in records])
+
+    async def update_many(
+        self,
+        values_list: List[Dict[str, Any]],
+        key: Optional[str] = None
+    ):
+        """
+        Updates rows in one transaction, every values dict contains key column
+        value to find row and new values of other columns. Default key is
+        first pk column. All values dicts must have the same keys.
+        Returns updated rows adapted by self._multiple_records_adapter
+        """
+        values_list = [clear_from_ellipsis(values) for values in values_list]
+        if not values_list:
+            return await self._get_multiple_records_adapter([])
+
+        if key is None:
+            key = self._get_first_pk_column_name
+        if any(key not in values for values in values_list):
+            raise Exception('Key Must Be Passed Exception')
+
+        async with unit_of_work():
+            records = await self._do_update_many(values_list, key)
+            if not self._returning_full_row:
+                return await self.select(
+                    filters={self._get_first_pk_column_name + '__in': records}
+                )
+
+        return await self._get_multiple_records_adapter([(record,) for record in records])
+
+    async def delete_many(
+        self,
+        filters_list: List[Mapping]
+    ):
+        """
+        Deletes all rows which satisfy any of filters and returns them adapted
+        by self._multiple_records_adapter
+        """
+        filters_list = [clear_from_ellipsis(filters) for filters in filters_list]
+        if not filters_list or not all(filters_list):
+            raise Exception('Filters Must Be Passed Exception')
+
+        records = await self._do_delete_many(filters_list)
+        return await self._get_multiple_records_adapter([(record,) for record in records])
+
+    async def copy_insert(
+        self,
+        values_list: Iterable[Mapping[str, Any]],
+        column_names: Sequence[str]
+    ) -> int:
+        """
+        Fast path for very large loads. Inserts rows by COPY ... FROM STDIN of
+        asyncpg connection in transaction of current unit of work, so rows
+        are rolled back with it, rows are not returned.
+        Values are processed by column types as it's done for bind
+        parameters, so e.g. JSON values are serialized.
+        Returns number of inserted rows
+        """
+        table = self._get_table()
+        async with unit_of_work() as uow:
+            connection = await uow.session.connection()
+            processors = [
+                self._get_column(column_name).type.bind_processor(connection.dialect)
+                for column_name in column_names
+            ]
+            records = (
+                tuple(
+                    processor(values[column_name]) if processor else values[column_name]
+                    for column_name, processor in zip(column_names, processors)
+                )
+                for values in values_list
+            )
+            driver_connection = await uow.get_driver_connection()
+            result: str = await driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=list(column_names),
+                schema_name=table.schema
+            )
+
+        # asyncpg returns command status like 'COPY 100'
+        return int(result.split()[-1])
+
+    async def upsert(
+        self,
+        values: Dict[str, Any],
+        update_values: Optional[Dict[str, Any]] = None,
+        conflict_columns: Optional[Sequence[str]] = None
+    ) -> Tuple[Any, bool]:
+        """
+        Inserts row with values or, if row with the same conflict columns
+        values exists, updates it with update_values by one atomic statement.
+        If update_values are not passed existing row is returned as is.
+        If conflict_columns are not passed they are taken from unique
+        constraint which columns are all in values.
+        Returns row adapted by self._single_record_adapter and True if row was inserted
+        """
+        values = clear_from_ellipsis(values)
+        update_values = clear_from_ellipsis(update_values or {})
+
+        if conflict_columns is None:
+            conflict_columns = self._get_conflict_columns(values)
+        if not conflict_columns:
+            raise Exception('Conflict Columns Not Found Exception')
+
+        record: Row = await self._do_upsert(values, update_values, conflict_columns)
+        return await self._get_single_record_adapter(record), record.inserted
+
+    async def stream(
+        self,
+        order_by: Optional[str] = None,
+        order_reversed: bool = False,
+        chunk_size: int = settings.PROVIDER_STREAM_CHUNK_SIZE,
+        filters: Mapping = {}
+    ) -> AsyncIterator:
+        """
+        Yields rows which satisfy filters by chunks of chunk_size rows adapted
+        by self._multiple_records_adapter, so only one chunk is kept in memory.
+
+        Rows are read by one statement through server side cursor, which
+        fetches chunk_size rows at a time, in one read only transaction, so
+        all chunks are read from one snapshot. Connection is held until
+        stream is exhausted or closed. Session of stream is not unit of work
+        of context, so provider calls made while chunk is processed run in
+        their own units of work.
+        Rows are ordered by order_by column from self._sorting_columns and
+        first pk column as tiebreaker, so order is stable for nullable
+        columns too, default is first pk column
+        """
+        filters = clear_from_ellipsis(filters)
+
+        first_pk_column_name = self._get_first_pk_column_name
+        columns: List[Column] = [self._get_column(first_pk_column_name)]
+        if order_by is not None and order_by != first_pk_column_name:
+            if order_by not in self._get_sorting_columns:
+                raise Exception('Sorting Column Not Found Exception')
+            columns.insert(0, self._get_column(order_by))
+
+        def build(bound_filters: Mapping) -> Select:
+            return self._get_select_stmt.where(
+                self._filters.build_where_clause(filters=bound_filters)
+            ).order_by(
+                *[c.desc() if order_reversed else c.asc() for c in columns]
+            )
+
+        stmt, params = self._get_cached_stmt(('stream', order_by, order_reversed), build, filters)
+
+        async with read_only_session() as session:
+            result = await session.stream(
+                stmt, params, execution_options={'yield_per': chunk_size}
+            )
+            async for records in result.partitions(chunk_size):
+                yield await self._get_multiple_records_adapter(records)
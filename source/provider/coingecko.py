@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import aiohttp
+import orjson as json
+
+from settings import settings
+from source.session import http_session
+from .exception import UpstreamThrottled, UpstreamUnavailable
+
+
+class CoinGeckoProvider:
+    """
+    Provider which requests CoinGecko public API through shared
+    keep-alive http session.
+
+    _semaphore is shared by all provider instances and bounds number of
+    outbound requests which are in flight at the same time
+    """
+
+    _base_url: str = settings.COINGECKO_API_URL
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def _get_semaphore(cls) -> asyncio.Semaphore:
+        if cls._semaphore is None:
+            cls._semaphore = asyncio.Semaphore(settings.COINGECKO_MAX_CONCURRENCY)
+        return cls._semaphore
+
+    async def _request(
+        self,
+        path: str,
+        params: Optional[Mapping[str, Any]] = None
+    ) -> Any:
+        """
+        Does GET request to CoinGecko API and returns json body decoded by orjson.
+        Raises UpstreamThrottled on 429 response and UpstreamUnavailable on
+        5xx response, timeout or connection error
+        """
+        session = http_session.get()
+        async with self._get_semaphore():
+            try:
+                async with session.get(f'{self._base_url}{path}', params=params) as response:
+                    if response.status == 429:
+                        raise UpstreamThrottled(
+                            'CoinGecko rate limit exceeded',
+                            retry_after=self._get_retry_after(response)
+                        )
+                    if response.status >= 500:
+                        raise UpstreamUnavailable(f'CoinGecko responded {response.status}')
+                    return json.loads(await response.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise UpstreamUnavailable(f'CoinGecko request failed: {e!r}') from e
+
+    @staticmethod
+    def _get_retry_after(
+        response: aiohttp.ClientResponse
+    ) -> Optional[float]:
+        try:
+            return float(response.headers['Retry-After'])
+        except (KeyError, ValueError):
+            return None
+
+    async def get_coin(
+        self,
+        coin_id: str
+    ) -> dict:
+        """
+        Returns coin document without tickers, localization, community and
+        developer data. Use get_prices if only price is needed
+        """
+        return await self._request(
+            f'/coins/{coin_id}',
+            params={
+                'localization': 'false',
+                'tickers': 'false',
+                'community_data': 'false',
+                'developer_data': 'false',
+                'sparkline': 'false',
+            }
+        )
+
+    async def get_prices(
+        self,
+        coin_ids: Iterable[str],
+        vs_currency: str = 'usd'
+    ) -> Dict[str, float]:
+        """
+        Returns prices of all passed coins by one request, unknown coin ids
+        are absent in result
+        """
+        coin_ids = sorted(set(coin_ids))
+        if not coin_ids:
+            return {}
+
+        response = await self._request(
+            '/simple/price',
+            params={'ids': ','.join(coin_ids), 'vs_currencies': vs_currency}
+        )
+        return {
+            coin_id: data[vs_currency]
+            for coin_id, data in response.items()
+            if vs_currency in data
+        }
+
+    async def get_coins_list(self) -> List[dict]:
+        return await self._request('/coins/list')
@@ -1 +1,2 @@
 from .assets import *
+from .coingecko import *
@@ -8,3 +8,7 @@ class AssetNameIncorrect:
 
 class AssetNotExist:
     detail = 'Этого актива нет в вашем портфолио'
+
+
+class AssetPriceUnavailable:
+    detail = 'Сервис цен временно недоступен, попробуйте позже'
@@ -0,0 +1,35 @@
+from typing import Optional
+
+
+class UpstreamError(Exception):
+    """
+    Base exception of failed request to external API which is worth to retry
+    """
+
+    def __init__(
+        self,
+        message: str = '',
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class UpstreamThrottled(UpstreamError):
+    """
+    External API responded 429 Too Many Requests
+    """
+
+
+class UpstreamUnavailable(UpstreamError):
+    """
+    External API responded 5xx, timed out, or it is not requested at all
+    while circuit breaker is open
+    """
+
+
+class PriceNotFound(Exception):
+    """
+    External API responded without price of existing coin, it's not worth
+    to retry
+    """
@@ -0,0 +1,160 @@
+from typing import List, Optional
+
+from sqlalchemy import select, func, distinct
+
+from settings import settings
+from source.service import domain
+from source.session import unit_of_work
+from .base import BaseAlchemyModelProvider
+from .prepared import PreparedQuery
+from . import serializer
+from . import models as orm_models
+
+
+class HoldingsProvider(BaseAlchemyModelProvider):
+
+    _mapper = orm_models.Holdings
+
+    _sorting_columns = ('id', 'tg_id', 'coin_id')
+
+    _single_record_adapter = staticmethod(serializer.record_to_holding)
+    _multiple_records_adapter = staticmethod(serializer.records_to_holdings)
+
+    _select_by_user_query = PreparedQuery(
+        name='holdings_by_tg_id_and_asset_type',
+        sql=(
+            f'SELECT {", ".join(domain.Holding.__fields__)} FROM holdings '
+            'WHERE tg_id = $1 AND asset_type = $2'
+        ),
+        decode=serializer.trusted_values_builder(domain.Holding, converters={'asset_type': domain.AssetsTypes})
+    )
+
+    async def select_by_user(
+        self,
+        tg_id: int,
+        asset_type: int,
+        fast: bool = settings.PROVIDER_ASYNCPG_FAST_PATH
+    ) -> domain.HoldingsList:
+        """
+        Returns holdings of user, runs as prepared statement if fast is True
+        """
+        if not fast:
+            return await self.select(filters={'tg_id': tg_id, 'asset_type': asset_type})
+
+        items = await self._select_by_user_query.fetch(tg_id, asset_type)
+        return domain.HoldingsList.construct(items=items)
+
+    async def add(
+        self,
+        tg_id: int,
+        asset_type: int,
+        coin_id: str,
+        quantity: float
+    ) -> Optional[domain.Holding]:
+        """
+        Inserts holding, returns None if user already holds coin_id
+        """
+        holding, inserted = await self.upsert({
+            'tg_id': tg_id,
+            'asset_type': asset_type,
+            'coin_id': coin_id,
+            'quantity': quantity
+        })
+        if not inserted:
+            return None
+        return holding
+
+    async def set_quantity(
+        self,
+        tg_id: int,
+        asset_type: int,
+        coin_id: str,
+        quantity: float
+    ) -> Optional[domain.Holding]:
+        """
+        Sets quantity of holding, returns None if user doesn't hold coin_id
+        """
+        record = await self._do_update(
+            filters={
+                'tg_id': tg_id,
+                'asset_type': asset_type,
+                'coin_id': coin_id
+            },
+            values={'quantity': quantity}
+        )
+        if record is None:
+            return None
+        return await self._get_single_record_adapter(record)
+
+    async def increment(
+        self,
+        tg_id: int,
+        asset_type: int,
+        coin_id: str,
+        delta: float
+    ) -> domain.Holding:
+        """
+        Adds delta to quantity of holding, missing holding is inserted with delta
+        """
+        holding, _ = await self.upsert(
+            values={
+                'tg_id': tg_id,
+                'asset_type': asset_type,
+                'coin_id': coin_id,
+                'quantity': delta
+            },
+            update_values={
+                'quantity': self._get_mapper.quantity + delta
+            }
+        )
+        return holding
+
+    async def select_coin_ids(
+        self,
+        asset_type: int
+    ) -> List[str]:
+        """
+        Returns distinct coin ids held by any user
+        """
+        stmt = select(distinct(self._get_mapper.coin_id)).where(self._get_mapper.asset_type == asset_type)
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt)).scalars().all()
+
+    async def select_holders(
+        self,
+        coin_id: str,
+        asset_type: int
+    ) -> List[int]:
+        """
+        Returns tg ids of users which hold coin_id
+        """
+        holdings = self._get_mapper
+        stmt = select(holdings.tg_id).where(
+            holdings.coin_id == coin_id,
+            holdings.asset_type == asset_type
+        )
+        async with unit_of_work(read_only=True) as uow:
+            return (await uow.session.execute(stmt)).scalars().all()
+
+    async def select_coin_totals(
+        self,
+        asset_type: int,
+        coin_ids: Optional[List[str]] = None
+    ) -> List[domain.CoinHoldingTotal]:
+        """
+        Returns total quantity and number of holders of every coin, or of
+        coin_ids only, by GROUP BY coin_id. Coins with most holders go first
+        """
+        holdings = self._get_mapper
+        holders = func.count(holdings.tg_id)
+        stmt = select(
+            holdings.coin_id, func.sum(holdings.quantity), holders
+        ).where(
+            holdings.asset_type == asset_type
+        ).group_by(holdings.coin_id).order_by(holders.desc())
+        if coin_ids is not None:
+            stmt = stmt.where(holdings.coin_id.in_(coin_ids))
+
+        async with unit_of_work(read_only=True) as uow:
+            records = (await uow.session.execute(stmt)).all()
+        return await serializer.records_to_coin_holding_totals(records)
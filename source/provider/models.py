@@ -1,4 +1,5 @@
 from sqlalchemy import *
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 from settings import settings
@@ -37,8 +38,72 @@ class Assets(AbstractORMBaseModel):
 
     tg_id = Column(BigInteger, ForeignKey(f'{Users.__tablename__}.tg_id', ondelete='CASCADE'))
     type = Column(SmallInteger(), nullable=False, default=domain.AssetsTypes.CRYPTO.value)
-    assets = Column(JSON)
+    # legacy, holdings are kept in holdings table. Column is left for
+    # instances of previous release and for values which holdings backfill
+    # skipped, it's dropped by a later release
+    assets = Column(JSONB)
 
     __table_args__ = (
         UniqueConstraint('tg_id', 'type', name='unique_tg_id_and_type'),
     )
+
+
+class Holdings(AbstractORMBaseModel):
+    """
+    One row per coin held by user, unique constraint index serves lookups by
+    (tg_id, asset_type) as its leading columns
+    """
+    __tablename__ = 'holdings'
+
+    tg_id = Column(BigInteger, ForeignKey(f'{Users.__tablename__}.tg_id', ondelete='CASCADE'), nullable=False)
+    asset_type = Column(SmallInteger(), nullable=False, default=domain.AssetsTypes.CRYPTO.value)
+    coin_id = Column(String(255), nullable=False, index=True)
+    quantity = Column(Float(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('tg_id', 'asset_type', 'coin_id', name='unique_tg_id_asset_type_coin_id'),
+    )
+
+
+class PriceHistory(AbstractORMBaseModel):
+    """
+    OHLC rollup of price ticks, resolution is bucket size in seconds
+    """
+    __tablename__ = 'price_history'
+
+    coin_id = Column(String(255), nullable=False)
+    resolution = Column(Integer(), nullable=False)
+    bucket = Column(DateTime(timezone=settings.USE_TIMEZONE), nullable=False)
+    open = Column(Float(), nullable=False)
+    high = Column(Float(), nullable=False)
+    low = Column(Float(), nullable=False)
+    close = Column(Float(), nullable=False)
+    opened_at = Column(DateTime(timezone=settings.USE_TIMEZONE), nullable=False)
+    closed_at = Column(DateTime(timezone=settings.USE_TIMEZONE), nullable=False)
+    ticks = Column(Integer(), nullable=False, default=1)
+
+    __table_args__ = (
+        UniqueConstraint('coin_id', 'resolution', 'bucket', name='unique_coin_id_resolution_bucket'),
+    )
+
+
+class PortfolioSnapshots(AbstractORMBaseModel):
+    __tablename__ = 'portfolio_snapshots'
+
+    tg_id = Column(BigInteger, ForeignKey(f'{Users.__tablename__}.tg_id', ondelete='CASCADE'), nullable=False)
+    total_value = Column(Float(), nullable=False)
+    created_at = Column(DateTime(timezone=settings.USE_TIMEZONE), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('ix_portfolio_snapshots_tg_id_created_at', 'tg_id', 'created_at'),
+    )
+
+
+class PriceAlerts(AbstractORMBaseModel):
+    __tablename__ = 'price_alerts'
+
+    tg_id = Column(BigInteger, ForeignKey(f'{Users.__tablename__}.tg_id', ondelete='CASCADE'), nullable=False, index=True)
+    coin_id = Column(String(255), nullable=False)
+    threshold = Column(Float(), nullable=False)
+    direction = Column(SmallInteger(), nullable=False)
+    created_at = Column(DateTime(timezone=settings.USE_TIMEZONE), server_default=func.now(), nullable=False)
@@ -0,0 +1,33 @@
+import datetime
+from typing import Sequence
+
+from .base import BaseAlchemyModelProvider
+from . import serializer
+from . import models as orm_models
+
+
+class PortfolioSnapshotsProvider(BaseAlchemyModelProvider):
+
+    _mapper = orm_models.PortfolioSnapshots
+
+    _sorting_columns = ('id', 'tg_id', 'created_at')
+
+    _single_record_adapter = staticmethod(serializer.record_to_portfolio_snapshot)
+    _multiple_records_adapter = staticmethod(serializer.records_to_portfolio_snapshots)
+
+    async def insert_snapshots(
+        self,
+        tg_ids: Sequence[int],
+        total_values: Sequence[float],
+        created_at: datetime.datetime
+    ) -> int:
+        """
+        Inserts snapshots of all users by one COPY
+        """
+        return await self.copy_insert(
+            (
+                {'tg_id': tg_id, 'total_value': total_value, 'created_at': created_at}
+                for tg_id, total_value in zip(tg_ids, total_values)
+            ),
+            column_names=('tg_id', 'total_value', 'created_at')
+        )
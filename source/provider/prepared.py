@@ -0,0 +1,106 @@
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from source.session import unit_of_work
+from .shared.instrumentation import query_instrumentation
+
+
+# Prepared statements of every asyncpg connection by query name, entries are
+# dropped with connection
+_connection_statements: 'weakref.WeakKeyDictionary[Any, Dict[str, Any]]' = weakref.WeakKeyDictionary()
+
+
+class PreparedQuery:
+    """
+    Fast path for the hottest queries, next to BaseAlchemyModelProvider.
+    sql is executed as named prepared statement on asyncpg connection of
+    current unit of work, so it bypasses ORM, filters building and
+    sqlalchemy compilation. Connection is taken by
+    UnitOfWork.get_driver_connection, so statement runs in transaction of
+    unit of work. Statement is prepared once per connection and kept in
+    per-connection cache. Records are decoded by decode, e.g. by
+    serializer.trusted_values_builder, from values in order of select list.
+
+    Reads start read only unit of work, so they go to replica as provider
+    reads do. Calls are recorded by query_instrumentation as 'Prepared.<name>'
+    """
+
+    # name prefix of server side prepared statements
+    STATEMENT_PREFIX = 'mdl_'
+
+    def __init__(
+        self,
+        name: str,
+        sql: str,
+        decode: Optional[Callable[[Any], Any]] = None,
+        read_only: bool = True
+    ):
+        self.name = name
+        self.sql = sql
+        self._decode = decode
+        self._read_only = read_only
+
+    async def _get_statement(
+        self,
+        uow
+    ):
+        driver_connection = await uow.get_driver_connection()
+        statements = _connection_statements.get(driver_connection)
+        if statements is None:
+            statements = _connection_statements[driver_connection] = {}
+        statement = statements.get(self.name)
+        if statement is None:
+            statement = statements[self.name] = await driver_connection.prepare(
+                self.sql, name=self.STATEMENT_PREFIX + self.name
+            )
+        return statement
+
+    async def _run(
+        self,
+        method: str,
+        args: tuple
+    ) -> Any:
+        started_at = time.perf_counter()
+        failed = True
+        result = None
+        try:
+            async with unit_of_work(read_only=self._read_only) as uow:
+                statement = await self._get_statement(uow)
+                result = await getattr(statement, method)(*args)
+            failed = False
+            return result
+        finally:
+            query_instrumentation.record(
+                provider='Prepared',
+                operation=self.name,
+                seconds=time.perf_counter() - started_at,
+                rows=len(result) if isinstance(result, list) else int(result is not None),
+                failed=failed,
+                shape='',
+            )
+
+    async def fetch(
+        self,
+        *args
+    ) -> List[Any]:
+        records = await self._run('fetch', args)
+        if self._decode is None:
+            return records
+        decode = self._decode
+        return [decode(record) for record in records]
+
+    async def fetchrow(
+        self,
+        *args
+    ) -> Optional[Any]:
+        record = await self._run('fetchrow', args)
+        if record is None or self._decode is None:
+            return record
+        return self._decode(record)
+
+    async def fetchval(
+        self,
+        *args
+    ) -> Any:
+        return await self._run('fetchval', args)
@@ -0,0 +1,127 @@
+import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects.postgresql import insert
+
+from settings import settings
+from source.service import domain
+from source.session import unit_of_work
+from .base import BaseAlchemyModelProvider
+from . import serializer
+from . import models as orm_models
+
+
+class PriceHistoryProvider(BaseAlchemyModelProvider):
+
+    _mapper = orm_models.PriceHistory
+
+    _sorting_columns = ('id', 'bucket')
+
+    _single_record_adapter = staticmethod(serializer.record_to_price_candle)
+    _multiple_records_adapter = staticmethod(serializer.records_to_price_candles)
+
+    _rollup_constraint = 'unique_coin_id_resolution_bucket'
+
+    @staticmethod
+    def _get_bucket(
+        time: datetime.datetime,
+        resolution: domain.PriceResolution
+    ) -> datetime.datetime:
+        timestamp = int(time.timestamp())
+        return datetime.datetime.fromtimestamp(
+            timestamp - timestamp % resolution, tz=datetime.timezone.utc
+        )
+
+    def _make_rollups(
+        self,
+        ticks: Iterable[domain.PriceTick]
+    ) -> List[dict]:
+        """
+        Aggregates ticks into one row per coin, resolution and bucket
+        """
+        rollups: Dict[Tuple[str, int, datetime.datetime], dict] = {}
+        for tick in ticks:
+            for resolution in domain.PriceResolution:
+                key = (tick.coin_id, resolution.value, self._get_bucket(tick.time, resolution))
+                rollup = rollups.get(key)
+                if rollup is None:
+                    rollups[key] = {
+                        'coin_id': tick.coin_id,
+                        'resolution': resolution.value,
+                        'bucket': key[2],
+                        'open': tick.price,
+                        'high': tick.price,
+                        'low': tick.price,
+                        'close': tick.price,
+                        'opened_at': tick.time,
+                        'closed_at': tick.time,
+                        'ticks': 1,
+                    }
+                    continue
+
+                rollup['high'] = max(rollup['high'], tick.price)
+                rollup['low'] = min(rollup['low'], tick.price)
+                rollup['ticks'] += 1
+                if tick.time < rollup['opened_at']:
+                    rollup['open'], rollup['opened_at'] = tick.price, tick.time
+                if tick.time >= rollup['closed_at']:
+                    rollup['close'], rollup['closed_at'] = tick.price, tick.time
+
+        return list(rollups.values())
+
+    async def ingest(
+        self,
+        ticks: Iterable[domain.PriceTick]
+    ) -> int:
+        """
+        Merges ticks into rollups of every resolution. Ticks are aggregated
+        in memory first, then every touched rollup row is upserted, so rollups
+        are never recomputed from raw ticks.
+        Returns number of upserted rollup rows
+        """
+        rollups = self._make_rollups(ticks)
+        table = self._get_table()
+
+        async with unit_of_work() as uow:
+            for i in range(0, len(rollups), settings.PRICE_HISTORY_INGEST_CHUNK_SIZE):
+                stmt = insert(table).values(rollups[i:i + settings.PRICE_HISTORY_INGEST_CHUNK_SIZE])
+                excluded = stmt.excluded
+                stmt = stmt.on_conflict_do_update(
+                    constraint=self._rollup_constraint,
+                    set_={
+                        'high': func.greatest(table.c.high, excluded.high),
+                        'low': func.least(table.c.low, excluded.low),
+                        'open': case(
+                            (excluded.opened_at < table.c.opened_at, excluded.open),
+                            else_=table.c.open
+                        ),
+                        'opened_at': func.least(table.c.opened_at, excluded.opened_at),
+                        'close': case(
+                            (excluded.closed_at >= table.c.closed_at, excluded.close),
+                            else_=table.c.close
+                        ),
+                        'closed_at': func.greatest(table.c.closed_at, excluded.closed_at),
+                        'ticks': table.c.ticks + excluded.ticks,
+                    }
+                )
+                await uow.session.execute(stmt)
+
+        return len(rollups)
+
+    async def select_series(
+        self,
+        coin_id: str,
+        resolution: domain.PriceResolution,
+        start: datetime.datetime,
+        end: datetime.datetime
+    ) -> domain.PriceCandleList:
+        return await self.select(
+            order_by='bucket',
+            filters={
+                'coin_id': coin_id,
+                'resolution': resolution.value,
+                'bucket__ge': self._get_bucket(start, resolution),
+                'bucket__le': end,
+            }
+        )
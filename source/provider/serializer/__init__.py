@@ -1,2 +1,6 @@
+from .base import *
 from .user import *
 from .assets import *
+from .prices import *
+from .alerts import *
+from .holdings import *
@@ -0,0 +1,26 @@
+from typing import List, Tuple
+
+from source.service import domain
+from source.provider import models as orm_models
+
+
+async def record_to_price_alert(
+    record: orm_models.PriceAlerts
+) -> domain.PriceAlert:
+    return domain.PriceAlert(
+        id=record.id,
+        tg_id=record.tg_id,
+        coin_id=record.coin_id,
+        threshold=record.threshold,
+        direction=record.direction
+    )
+
+
+async def records_to_price_alerts(
+    records: List[Tuple[orm_models.PriceAlerts]]
+) -> domain.PriceAlertList:
+    alerts = domain.PriceAlertList()
+    for record in records:
+        alerts.items.append(await record_to_price_alert(*record))
+
+    return alerts
@@ -1,27 +1,32 @@
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 from source.service import domain
 from source.provider import models as orm_models
+from .base import trusted_values_builder, trusted_list_builder
+
+
+# rows of assets table are trusted, so models are built without validation.
+# Holdings are stored in holdings table, legacy assets column is not read
+build_assets_values = trusted_values_builder(domain.Assets, converters={'assets_type': domain.AssetsTypes})
+
+
+def build_assets(record: orm_models.Assets) -> domain.Assets:
+    return build_assets_values((record.tg_id, None, record.type))
+
+
+build_assets_list = trusted_list_builder(domain.AssetsList, build_assets)
 
 
 async def record_to_assets(
     record: orm_models.Assets
 ) -> domain.Assets:
-    return domain.Assets(
-        tg_id=record.tg_id,
-        assets=record.assets,
-        assets_type=record.type
-    )
+    return build_assets(record)
 
 
 async def records_to_assets(
     records: List[Tuple[orm_models.Assets]]
 ) -> domain.AssetsList:
-    assets_list = domain.AssetsList()
-    for record in records:
-        assets_list.items.append(await record_to_assets(*record))
-
-    return assets_list
+    return build_assets_list(records)
 
 
 async def data_to_crypto_info(response: dict) -> domain.CryptoInfo:
@@ -31,3 +36,65 @@ async def data_to_crypto_info(response: dict) -> domain.CryptoInfo:
         price=response['market_data']['current_price']['usd']
     )
     return crypto_info
+
+
+async def coin_to_crypto_info(
+    coin: domain.Coin,
+    price: float
+) -> domain.CryptoInfo:
+    return domain.CryptoInfo(
+        name=coin.name,
+        symbol=coin.symbol,
+        price=price
+    )
+
+
+async def data_to_portfolio(
+    assets: domain.Assets,
+    prices: Dict[str, float]
+) -> domain.Portfolio:
+    portfolio = domain.Portfolio(tg_id=assets.tg_id)
+    for crypto_name, value in (assets.assets or {}).items():
+        price = prices.get(crypto_name)
+        total = price * value if price is not None else None
+        portfolio.items.append(domain.PortfolioItem(
+            name=crypto_name,
+            value=value,
+            price=price,
+            total=total
+        ))
+        if total is not None:
+            portfolio.total += total
+
+    return portfolio
+
+
+async def data_to_coins(response: List[dict]) -> List[domain.Coin]:
+    return [
+        domain.Coin(
+            id=data['id'],
+            symbol=data['symbol'],
+            name=data['name']
+        )
+        for data in response
+    ]
+
+
+async def record_to_portfolio_snapshot(
+    record: orm_models.PortfolioSnapshots
+) -> domain.PortfolioSnapshot:
+    return domain.PortfolioSnapshot(
+        tg_id=record.tg_id,
+        total_value=record.total_value,
+        created_at=record.created_at
+    )
+
+
+async def records_to_portfolio_snapshots(
+    records: List[Tuple[orm_models.PortfolioSnapshots]]
+) -> domain.PortfolioSnapshotList:
+    snapshots = domain.PortfolioSnapshotList()
+    for record in records:
+        snapshots.items.append(await record_to_portfolio_snapshot(*record))
+
+    return snapshots
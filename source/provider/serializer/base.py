@@ -0,0 +1,81 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Mapping, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+
+
+Model = TypeVar('Model', bound=BaseModel)
+
+
+def trusted_values_builder(
+    model: Type[Model],
+    converters: Mapping[str, Callable[[Any], Any]] = {}
+) -> Callable[[Iterable], Model]:
+    """
+    Returns function which builds model without validation, like
+    model.construct, from values of all model fields in order of
+    model.__fields__, e.g. from asyncpg record of
+    SELECT <model fields> FROM ... . It must be used only for rows of our
+    own schema, which already have types of model fields.
+
+    converters are applied to values of fields, e.g.
+    {'assets_type': domain.AssetsTypes}.
+    Every field is set, every instance gets its own copy of __fields_set__,
+    so assignment to one instance doesn't change others
+    """
+    field_names = tuple(model.__fields__)
+    fields_set = frozenset(field_names)
+    converted = tuple(converters.items())
+    new = model.__new__
+
+    def build(record_values: Iterable) -> Model:
+        values: Dict[str, Any] = dict(zip(field_names, record_values))
+        for name, converter in converted:
+            value = values[name]
+            if value is not None:
+                values[name] = converter(value)
+        instance = new(model)
+        object.__setattr__(instance, '__dict__', values)
+        object.__setattr__(instance, '__fields_set__', set(fields_set))
+        return instance
+
+    return build
+
+
+def trusted_model_builder(
+    model: Type[Model],
+    attributes: Mapping[str, str] = {},
+    converters: Mapping[str, Callable[[Any], Any]] = {}
+) -> Callable[[Any], Model]:
+    """
+    Returns function which builds model from attributes of orm instance or
+    row by trusted_values_builder, attribute getter is prepared once.
+    attributes maps field names to record attribute names if they differ,
+    e.g. {'assets_type': 'type'}
+    """
+    field_names = tuple(model.__fields__)
+    getter = attrgetter(*[attributes.get(name, name) for name in field_names])
+    if len(field_names) == 1:
+        single_getter = getter
+        getter = lambda record: (single_getter(record),)
+    build_from_values = trusted_values_builder(model, converters)
+
+    def build(record: Any) -> Model:
+        return build_from_values(getter(record))
+
+    return build
+
+
+def trusted_list_builder(
+    list_model: Type[Model],
+    build: Callable[[Any], BaseModel]
+) -> Callable[[Iterable[Sequence]], Model]:
+    """
+    Returns function which builds list model with items field, e.g.
+    domain.UserList, from rows with one orm instance, e.g. result of
+    select(orm_models.Users), in one pass
+    """
+    def build_list(records: Iterable[Sequence]) -> Model:
+        return list_model.construct(items=[build(record[0]) for record in records])
+
+    return build_list
@@ -0,0 +1,46 @@
+from typing import Iterable, List, Tuple
+
+from source.service import domain
+from source.provider import models as orm_models
+from .base import trusted_model_builder, trusted_list_builder
+
+
+# rows of holdings table are trusted, so models are built without validation
+build_holding = trusted_model_builder(
+    domain.Holding,
+    converters={'asset_type': domain.AssetsTypes}
+)
+build_holdings_list = trusted_list_builder(domain.HoldingsList, build_holding)
+
+
+async def record_to_holding(
+    record: orm_models.Holdings
+) -> domain.Holding:
+    return build_holding(record)
+
+
+async def records_to_holdings(
+    records: List[Tuple[orm_models.Holdings]]
+) -> domain.HoldingsList:
+    return build_holdings_list(records)
+
+
+async def holdings_to_assets(
+    tg_id: int,
+    asset_type: domain.AssetsTypes,
+    holdings: Iterable[domain.Holding]
+) -> domain.Assets:
+    return domain.Assets(
+        tg_id=tg_id,
+        assets={holding.coin_id: holding.quantity for holding in holdings},
+        assets_type=asset_type
+    )
+
+
+async def records_to_coin_holding_totals(
+    records: List[Tuple[str, float, int]]
+) -> List[domain.CoinHoldingTotal]:
+    return [
+        domain.CoinHoldingTotal(coin_id=coin_id, quantity=quantity, holders=holders)
+        for coin_id, quantity, holders in records
+    ]
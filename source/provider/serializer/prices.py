@@ -0,0 +1,29 @@
+from typing import List, Tuple
+
+from source.service import domain
+from source.provider import models as orm_models
+
+
+async def record_to_price_candle(
+    record: orm_models.PriceHistory
+) -> domain.PriceCandle:
+    return domain.PriceCandle(
+        coin_id=record.coin_id,
+        resolution=record.resolution,
+        bucket=record.bucket,
+        open=record.open,
+        high=record.high,
+        low=record.low,
+        close=record.close,
+        ticks=record.ticks
+    )
+
+
+async def records_to_price_candles(
+    records: List[Tuple[orm_models.PriceHistory]]
+) -> domain.PriceCandleList:
+    candles = domain.PriceCandleList()
+    for record in records:
+        candles.items.append(await record_to_price_candle(*record))
+
+    return candles
@@ -0,0 +1,276 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+
+
+class CacheStats:
+    """
+    Counters of cache usage:
+    hits - fresh values returned from cache
+    stale_hits - expired values returned while they are being revalidated
+    misses - values which had to be fetched
+    coalesced - misses which joined already running fetch of the same key
+    evictions - values evicted because of max_size
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.stale_hits + self.misses
+        if not total:
+            return 0.0
+        return (self.hits + self.stale_hits) / total
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_ratio': self.hit_ratio,
+        }
+
+
+class TTLCache:
+    """
+    In-process cache with time to live and LRU eviction.
+
+    ttl: seconds while value is fresh and returned as is
+    stale_ttl: seconds after ttl while value is still returned, but it is
+    refreshed in background (stale-while-revalidate)
+    max_size: max number of keys, least recently used key is evicted first
+
+    get_or_fetch coalesces concurrent misses of the same key, so only one
+    fetch is in flight per key. If fetch raises, nothing is cached and
+    exception is raised to every waiter
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        stale_ttl: float = 0
+    ):
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._max_size = max_size
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = CacheStats()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self,
+        key: Hashable,
+        default: Any = None
+    ) -> Any:
+        """
+        Returns fresh value by key or default, expired values are not returned
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[1] >= self._ttl:
+            self.stats.misses += 1
+            return default
+
+        self.stats.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any
+    ) -> None:
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(
+        self,
+        key: Hashable
+    ) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Returns cached value by key, if value is missing or expired awaits
+        fetch() and caches its result
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age < self._ttl:
+                self.stats.hits += 1
+                self._entries.move_to_end(key)
+                return value
+
+            if age < self._ttl + self._stale_ttl:
+                self.stats.stale_hits += 1
+                self._entries.move_to_end(key)
+                if key not in self._in_flight:
+                    self._start_fetch(key, fetch).add_done_callback(self._consume_exception)
+                return value
+
+            del self._entries[key]
+
+        self.stats.misses += 1
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            future = self._start_fetch(key, fetch)
+
+        # shield prevents cancellation of one waiter to cancel fetch of others
+        return await asyncio.shield(future)
+
+    def _start_fetch(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Future:
+        future = asyncio.ensure_future(self._load(key, fetch))
+        self._in_flight[key] = future
+        return future
+
+    async def _load(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            value = await fetch()
+            self.set(key, value)
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    @staticmethod
+    def _consume_exception(future: asyncio.Future) -> None:
+        """
+        Background revalidation errors are ignored, stale value stays in cache
+        """
+        if not future.cancelled():
+            future.exception()
+
+
+class VersionedCache:
+    """
+    TTLCache of values which belong to rows, every value is stored with pk
+    of its row and version tag, i.e. value of write counter before value
+    was read. Writes of row set its version to next counter value, so
+    values read before write are not returned anymore. Value is checked
+    on get, so invalidation doesn't search keys of row.
+
+    Values of rows written less than settle_time seconds ago are not
+    stored, since they may be read from replica which doesn't have the write
+    yet.
+
+    Last versions of max_size rows are kept, when version of row is
+    evicted it raises floor version, which is version of all rows without
+    own one, so evicted rows are treated as written then.
+    invalidate_all raises floor to current counter value
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        settle_time: float = 0
+    ):
+        self._cache = TTLCache(ttl=ttl, max_size=max_size)
+        self._max_size = max_size
+        self._settle_time = settle_time
+        self._counter = 0
+        # version and monotonic time of write
+        self._floor: Tuple[int, float] = (0, 0.0)
+        self._versions: 'OrderedDict[Hashable, Tuple[int, float]]' = OrderedDict()
+
+    @property
+    def stats(self) -> CacheStats:
+        return self._cache.stats
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def tag(self) -> int:
+        """
+        Version tag to store value with, it must be taken before value is read
+        """
+        return self._counter
+
+    def _get_version(
+        self,
+        pk: Hashable
+    ) -> Tuple[int, float]:
+        return self._versions.get(pk, self._floor)
+
+    def get(
+        self,
+        key: Hashable,
+        default: Any = None
+    ) -> Any:
+        entry = self._cache.get(key)
+        if entry is None:
+            return default
+
+        pk, tag, value = entry
+        version, _ = self._get_version(pk)
+        if tag < version:
+            self._cache.invalidate(key)
+            # TTLCache counted it as hit
+            self.stats.hits -= 1
+            self.stats.misses += 1
+            return default
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        pk: Hashable,
+        tag: int,
+        value: Any
+    ) -> None:
+        version, written_at = self._get_version(pk)
+        if tag < version or time.monotonic() - written_at < self._settle_time:
+            return
+        self._cache.set(key, (pk, tag, value))
+
+    def invalidate(
+        self,
+        pks: Iterable[Hashable]
+    ) -> None:
+        self._counter += 1
+        version = (self._counter, time.monotonic())
+        for pk in pks:
+            self._versions[pk] = version
+            self._versions.move_to_end(pk)
+        while len(self._versions) > self._max_size:
+            _, evicted = self._versions.popitem(last=False)
+            self._floor = max(self._floor, evicted)
+
+    def invalidate_all(self) -> None:
+        self._counter += 1
+        self._floor = (self._counter, time.monotonic())
+        self._versions.clear()
+        self._cache.clear()
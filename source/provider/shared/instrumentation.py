@@ -0,0 +1,350 @@
+import asyncio
+import datetime
+import functools
+import heapq
+import itertools
+import logging
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# Upper bounds of latency histogram buckets in seconds, last bucket is +inf
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class OperationStats:
+    """
+    Counters and latency histogram of one operation of one provider
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(
+        self,
+        seconds: float,
+        rows: int,
+        failed: bool
+    ) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.rows += rows
+        self.total_time += seconds
+        self.max_time = max(self.max_time, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    @property
+    def avg_time(self) -> float:
+        if not self.calls:
+            return 0.0
+        return self.total_time / self.calls
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns upper bound of bucket which contains q-th percentile,
+        max_time if it's in the last bucket
+        """
+        needed = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= needed:
+                return bound
+        return self.max_time
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_time': self.total_time,
+            'avg_time': self.avg_time,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'max_time': self.max_time,
+            'buckets': dict(zip((*LATENCY_BUCKETS, float('inf')), self.buckets)),
+        }
+
+
+class SlowQuery(NamedTuple):
+    seconds: float
+    provider: str
+    operation: str
+    shape: str
+    statement: Optional[str]
+    created_at: datetime.datetime
+
+
+class _Measurement:
+    """
+    Statement executed by measured provider call, it's filled by cursor
+    execute event of engine
+    """
+
+    __slots__ = ('statement', 'parameters', 'engine', 'executemany')
+
+    def __init__(self):
+        self.statement: Optional[str] = None
+        self.parameters: Any = None
+        self.engine: Optional[Engine] = None
+        self.executemany = False
+
+
+_current_measurement: ContextVar[Optional[_Measurement]] = ContextVar('current_measurement', default=None)
+
+
+def describe_shape(value: Any) -> str:
+    """
+    Describes filters or values without values themselves, e.g.
+    {'tg_id': 1, 'type': 0} -> '{tg_id, type}',
+    [{'id': 1}, {'id': 2}] -> '2 x {id}'
+    """
+    if isinstance(value, Mapping):
+        return '{' + ', '.join(
+            f'{key}: {describe_shape(item)}' if isinstance(item, Mapping) else str(key)
+            for key, item in value.items()
+        ) + '}'
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], Mapping):
+        return f'{len(value)} x {describe_shape(value[0])}'
+    return ''
+
+
+def _get_shape(
+    args: Sequence,
+    kwargs: Mapping
+) -> str:
+    """
+    Returns shape of filters of _do_* call, e.g. _do_select(filters=...),
+    or of its first argument, e.g. _do_update(filters, values), _do_insert(**values)
+    """
+    if 'filters' in kwargs:
+        return describe_shape(kwargs['filters'])
+    if kwargs:
+        return describe_shape(kwargs)
+    if args:
+        return describe_shape(args[0])
+    return ''
+
+
+def _count_rows(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+class QueryInstrumentation:
+    """
+    Collects latency histograms, row and error counts per provider class and
+    operation, keeps slowest_size slowest statements with shapes of their
+    filters. Statement which takes more than slow_threshold seconds is logged
+    with EXPLAIN plan, plan is got in separate task by new connection, so
+    measured call is not delayed
+    """
+
+    def __init__(
+        self,
+        slow_threshold: float = settings.PROVIDER_SLOW_QUERY_THRESHOLD,
+        slowest_size: int = settings.PROVIDER_SLOWEST_QUERIES_SIZE,
+        explain: bool = settings.PROVIDER_EXPLAIN_SLOW_QUERIES,
+    ):
+        self._slow_threshold = slow_threshold
+        self._slowest_size = slowest_size
+        self._explain = explain
+        self._stats: Dict[Tuple[str, str], OperationStats] = {}
+        self._slowest: List[Tuple[float, int, SlowQuery]] = []
+        self._counter = itertools.count()
+        self._engines: Dict[Engine, AsyncEngine] = {}
+        self._explain_tasks: set = set()
+
+    def listen(
+        self,
+        engine: AsyncEngine
+    ) -> None:
+        """
+        Subscribes to cursor executions of engine to know statements of
+        measured calls
+        """
+        self._engines[engine.sync_engine] = engine
+        event.listen(engine.sync_engine, 'before_cursor_execute', self._on_cursor_execute)
+
+    @staticmethod
+    def _on_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        measurement = _current_measurement.get()
+        if measurement is not None:
+            measurement.statement = statement
+            measurement.parameters = parameters
+            measurement.engine = conn.engine
+            measurement.executemany = executemany
+
+    def instrumented(
+        self,
+        operation: str
+    ) -> Callable:
+        """
+        Decorator of provider _do_* methods which measures every call
+        """
+        def decorator(method: Callable) -> Callable:
+            @functools.wraps(method)
+            async def wrapper(provider, *args, **kwargs):
+                measurement = _Measurement()
+                token = _current_measurement.set(measurement)
+                started_at = time.perf_counter()
+                failed = True
+                result = None
+                try:
+                    result = await method(provider, *args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    _current_measurement.reset(token)
+                    self.record(
+                        provider=type(provider).__name__,
+                        operation=operation,
+                        seconds=time.perf_counter() - started_at,
+                        rows=_count_rows(result),
+                        failed=failed,
+                        shape=_get_shape(args, kwargs),
+                        measurement=measurement
+                    )
+            return wrapper
+        return decorator
+
+    def record(
+        self,
+        provider: str,
+        operation: str,
+        seconds: float,
+        rows: int,
+        failed: bool,
+        shape: str,
+        measurement: Optional[_Measurement] = None
+    ) -> None:
+        stats = self._stats.get((provider, operation))
+        if stats is None:
+            stats = self._stats[(provider, operation)] = OperationStats()
+        stats.observe(seconds, rows, failed)
+
+        statement = measurement.statement if measurement is not None else None
+        if len(self._slowest) < self._slowest_size or seconds > self._slowest[0][0]:
+            slow_query = SlowQuery(
+                seconds=seconds,
+                provider=provider,
+                operation=operation,
+                shape=shape,
+                statement=statement,
+                created_at=datetime.datetime.now(datetime.timezone.utc)
+            )
+            item = (seconds, next(self._counter), slow_query)
+            if len(self._slowest) < self._slowest_size:
+                heapq.heappush(self._slowest, item)
+            else:
+                heapq.heapreplace(self._slowest, item)
+
+        if seconds >= self._slow_threshold:
+            logger.warning(
+                'Slow query %s.%s %s took %.3fs: %s',
+                provider, operation, shape, seconds, statement
+            )
+            if self._explain and statement is not None and not measurement.executemany:
+                self._schedule_explain(measurement)
+
+    def _schedule_explain(
+        self,
+        measurement: _Measurement
+    ) -> None:
+        engine = self._engines.get(measurement.engine)
+        if engine is None:
+            return
+        task = asyncio.create_task(
+            self._log_explain(engine, measurement.statement, measurement.parameters)
+        )
+        # keep reference until task is done
+        self._explain_tasks.add(task)
+        task.add_done_callback(self._explain_tasks.discard)
+
+    @staticmethod
+    async def _log_explain(
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Sequence
+    ) -> None:
+        """
+        EXPLAIN without ANALYZE doesn't execute statement, so it's safe for writes
+        """
+        try:
+            async with engine.connect() as connection:
+                result = await connection.exec_driver_sql('EXPLAIN ' + statement, tuple(parameters))
+                plan = '\n'.join(row[0] for row in result)
+        except Exception as e:
+            logger.warning('Slow query is not explained: %r', e)
+            return
+        logger.warning('Slow query plan:\n%s', plan)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns stats by 'Provider.operation', operations with most total time go first
+        """
+        items = sorted(self._stats.items(), key=lambda item: item[1].total_time, reverse=True)
+        return {
+            f'{provider}.{operation}': stats.as_dict()
+            for (provider, operation), stats in items
+        }
+
+    def get_slowest(self) -> List[SlowQuery]:
+        """
+        Returns slowest queries, slowest first
+        """
+        return [slow_query for *_, slow_query in sorted(self._slowest, reverse=True)]
+
+    def reset(self) -> None:
+        self._stats.clear()
+        self._slowest.clear()
+
+    def dump(
+        self,
+        slowest_limit: int = 5
+    ) -> str:
+        """
+        Returns stats and slowest queries as text
+        """
+        lines = ['Provider queries (avg / p95 / max, ms):']
+        for name, stats in self.get_stats().items():
+            lines.append(
+                f'{name}: {stats["calls"]} calls, {stats["errors"]} errors, {stats["rows"]} rows, '
+                f'{stats["avg_time"] * 1000:.1f} / {stats["p95"] * 1000:.1f} / {stats["max_time"] * 1000:.1f}'
+            )
+        lines.append('')
+        lines.append('Slowest queries:')
+        for slow_query in self.get_slowest()[:slowest_limit]:
+            lines.append(
+                f'{slow_query.seconds * 1000:.1f} ms {slow_query.provider}.{slow_query.operation} '
+                f'{slow_query.shape} at {slow_query.created_at:%H:%M:%S}'
+            )
+            if slow_query.statement:
+                lines.append(f'  {" ".join(slow_query.statement.split())}')
+        return '\n'.join(lines)
+
+
+query_instrumentation = QueryInstrumentation()
@@ -1,9 +1,28 @@
+import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from sqlalchemy import Boolean, SmallInteger, cast, column, literal, literal_column, select
+from sqlalchemy import values as values_clause
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.engine import Row
+
+from settings import settings
+from source.service import domain
+from source.session import unit_of_work
 from .base import BaseAlchemyModelProvider
+from .prepared import PreparedQuery
+from .shared.instrumentation import query_instrumentation
+from .shared.utils import clear_from_ellipsis
 from . import serializer
 from . import models as orm_models
 
 
 class UsersProvider(BaseAlchemyModelProvider):
+    """
+    get_by_tg_id runs on every update, it runs as prepared statement if
+    fast is True, otherwise by ORM statement. Users are cached by read
+    cache, get_by_tg_id shares it with get by tg_id
+    """
 
     _mapper = orm_models.Users
 
@@ -11,3 +30,125 @@ class UsersProvider(BaseAlchemyModelProvider):
 
     _single_record_adapter = staticmethod(serializer.record_to_users)
     _multiple_records_adapter = staticmethod(serializer.records_to_users)
+
+    _read_cache_ttl = settings.PROVIDER_READ_CACHE_TTL
+    _read_cache_row_key = 'tg_id'
+
+    _get_by_tg_id_query = PreparedQuery(
+        name='user_by_tg_id',
+        sql=f'SELECT {", ".join(domain.Users.__fields__)} FROM users WHERE tg_id = $1',
+        decode=serializer.trusted_values_builder(domain.Users)
+    )
+
+    async def find_by_tg_id(
+        self,
+        tg_id: int,
+        fast: bool = settings.PROVIDER_ASYNCPG_FAST_PATH
+    ) -> Optional[domain.Users]:
+        """
+        Returns user or None if there is no user with tg_id
+        """
+        async def fetch() -> Tuple[Optional[int], Optional[domain.Users]]:
+            if not fast:
+                record = await self._do_get(filters={'tg_id': tg_id})
+                if record is None:
+                    return None, None
+                return tg_id, await self._get_single_record_adapter(*record)
+
+            user = await self._get_by_tg_id_query.fetchrow(tg_id)
+            return (tg_id if user is not None else None), user
+
+        key = self._make_read_cache_key('get', {'tg_id': tg_id}) if self._read_cache is not None else None
+        return await self._cached_read(key, fetch)
+
+    async def get_by_tg_id(
+        self,
+        tg_id: int,
+        fast: bool = settings.PROVIDER_ASYNCPG_FAST_PATH
+    ) -> domain.Users:
+        user = await self.find_by_tg_id(tg_id, fast=fast)
+        if user is None:
+            raise Exception(self._does_not_exist_exception)
+        return user
+
+    async def touch_last_activity_many(
+        self,
+        last_activities: Mapping[int, datetime.datetime]
+    ) -> int:
+        """
+        Sets last_activity of many users by bulk UPDATE ... FROM (VALUES ...)
+        statements without RETURNING, keys are tg ids.
+        Returns number of updated users
+        """
+        if not last_activities:
+            return 0
+
+        values_list = [
+            {'tg_id': tg_id, 'last_activity': last_activity}
+            for tg_id, last_activity in last_activities.items()
+        ]
+        async with unit_of_work():
+            return await self._do_update_many(values_list, 'tg_id', returning=False)
+
+    @query_instrumentation.instrumented('register')
+    async def _do_register(
+        self,
+        values: Dict[str, Any],
+        asset_types: Iterable[int]
+    ) -> Row:
+        """
+        Executes one statement
+        WITH new_user AS (
+            INSERT INTO users ... ON CONFLICT (tg_id) DO UPDATE SET last_activity = ...
+            RETURNING users.*, xmax = 0 AS inserted
+        ), new_assets AS (
+            INSERT INTO assets (tg_id, type, assets)
+            SELECT new_user.tg_id, asset_types.type, '{}' FROM new_user, (VALUES ...) AS asset_types
+            WHERE new_user.inserted ON CONFLICT DO NOTHING
+        )
+        SELECT * FROM new_user
+        Assets rows are inserted only with new user, so concurrent
+        registrations of the same user create them once. Rows are created as
+        by previous release, which still reads them during rolling deploy
+        """
+        users = self._get_table()
+        user_stmt = pg_insert(users).values(**values)
+        new_user = user_stmt.on_conflict_do_update(
+            index_elements=['tg_id'],
+            set_={'last_activity': user_stmt.excluded.last_activity}
+        ).returning(
+            *users.columns,
+            literal_column('xmax = 0', Boolean).label('inserted')
+        ).cte('new_user')
+
+        assets = orm_models.Assets.__table__
+        types = values_clause(
+            column('type', SmallInteger),
+            name='asset_types'
+        ).data([(asset_type,) for asset_type in asset_types])
+        new_assets = pg_insert(assets).from_select(
+            ['tg_id', 'type', 'assets'],
+            select(
+                new_user.c.tg_id, types.c.type, cast(literal('{}'), JSONB)
+            ).where(new_user.c.inserted)
+        ).on_conflict_do_nothing().cte('new_assets')
+
+        stmt = select(new_user).add_cte(new_assets)
+        async with unit_of_work() as uow:
+            record = (await uow.session.execute(stmt)).first()
+            self._invalidate_read_cache(uow, [record.tg_id])
+            return record
+
+    async def register(
+        self,
+        values: Dict[str, Any],
+        asset_types: Iterable[int]
+    ) -> Tuple[domain.Users, bool]:
+        """
+        Inserts user with assets rows of asset_types or, if user with
+        values tg_id exists, updates last_activity of the user, by one statement.
+        Returns user and True if user was inserted
+        """
+        values = clear_from_ellipsis(values)
+        record = await self._do_register(values, list(asset_types))
+        return await self._get_single_record_adapter(record), record.inserted
@@ -2,13 +2,16 @@ from aiogram import types
 from aiogram.dispatcher import Dispatcher
 from aiogram.dispatcher.filters import Text
 
-from source.handlers.base_state import cancel_state, FSMGetCryptoPrice, FSMAddCryptoAsset, FSMEditCryptoAsset
+from source.handlers.base_state import cancel_state, FSMGetCryptoPrice, FSMAddCryptoAsset, FSMEditCryptoAsset, \
+    FSMAddPriceAlert, FSMDeletePriceAlert
 from source.handlers.start import start_bot
 from source.handlers.crypto_assets import CryptoPriceHandler, CryptoAssetHandler, CryptoAssetStateHandler
 from source.handlers.user import get_main_menu_keyboards, return_message, add_user_phone
 from source.handlers.assets_menu import get_assets_menu, get_crypto_assets_menu
+from source.handlers.price_alerts import PriceAlertHandler, notify_price_alert
+from source.service.alerts import PriceAlertService
 from source.handlers.admin import machine_state, \
-    load_name, load_photo, is_admin, is_moderator_chat, FSMAdmin
+    load_name, load_photo, is_admin, is_moderator_chat, get_query_stats, FSMAdmin
 
 
 def register_start_handlers(
@@ -43,6 +46,27 @@ def register_assets_handlers(
     dispatcher.register_message_handler(CryptoAssetHandler().get_assets, commands=['show_crypto_assets'])
 
 
+def register_price_alert_handlers(
+    dispatcher: Dispatcher
+):
+    PriceAlertService.set_notifier(notify_price_alert)
+    handler = PriceAlertHandler()
+
+    dispatcher.register_message_handler(handler.get_alerts, commands=['price_alerts'])
+
+    dispatcher.register_message_handler(cancel_state, state='*', commands='cancel')
+    dispatcher.register_message_handler(cancel_state, Text(equals='cancel', ignore_case=True), state='*')
+
+    # ----------- ADD PRICE ALERT ----------- #
+    dispatcher.register_message_handler(handler.add_alert_state_starter, commands=['add_price_alert'])
+    dispatcher.register_message_handler(handler.save_alert_name_in_state_data, state=FSMAddPriceAlert.crypto_name)
+    dispatcher.register_message_handler(handler.add_alert, state=FSMAddPriceAlert.threshold)
+
+    # ----------- DELETE PRICE ALERT ----------- #
+    dispatcher.register_message_handler(handler.delete_alert_state_starter, commands=['delete_price_alert'])
+    dispatcher.register_message_handler(handler.delete_alert, state=FSMDeletePriceAlert.alert_id)
+
+
 def register_admin_handlers(
     dispatcher: Dispatcher
 ):
@@ -55,6 +79,7 @@ def register_admin_handlers(
     dispatcher.register_message_handler(load_name, state=FSMAdmin.name)
     dispatcher.register_message_handler(is_moderator_chat, commands=['am_i_moderator'], is_chat_admin=True)
     dispatcher.register_message_handler(is_admin, commands=['am_i_admin'])
+    dispatcher.register_message_handler(get_query_stats, commands=['query_stats'])
 
 
 def register_user_handlers(
@@ -0,0 +1,257 @@
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Union
+
+from source.service import domain
+from source.session import unit_of_work
+from source.provider.alerts import PriceAlertsProvider
+from source.provider.exception import AssetNameIncorrect, AssetPriceUnavailable
+from .assets import AssetsService
+
+
+logger = logging.getLogger(__name__)
+
+
+class _CoinAlerts:
+    """
+    Alerts of one coin. Thresholds are kept sorted ascending, ids are kept in
+    parallel lists in the same order
+    """
+
+    __slots__ = ('above_thresholds', 'above_ids', 'below_thresholds', 'below_ids')
+
+    def __init__(self):
+        self.above_thresholds: List[float] = []
+        self.above_ids: List[int] = []
+        self.below_thresholds: List[float] = []
+        self.below_ids: List[int] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.above_ids or self.below_ids)
+
+
+class PriceAlertIndex:
+    """
+    In-memory index of price alerts.
+    ABOVE alerts trigger when price >= threshold, so triggered alerts are
+    prefix of sorted thresholds up to bisect_right(price).
+    BELOW alerts trigger when price <= threshold, so triggered alerts are
+    suffix of sorted thresholds from bisect_left(price).
+    So every tick touches only triggered alerts
+    """
+
+    def __init__(self):
+        self._coins: Dict[str, _CoinAlerts] = {}
+        self._alerts: Dict[int, domain.PriceAlert] = {}
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    @property
+    def coin_ids(self) -> List[str]:
+        return list(self._coins)
+
+    def rebuild(
+        self,
+        alerts: Iterable[domain.PriceAlert]
+    ) -> None:
+        self._coins.clear()
+        self._alerts.clear()
+        for alert in alerts:
+            self.add(alert)
+
+    def add(
+        self,
+        alert: domain.PriceAlert
+    ) -> None:
+        coin = self._coins.setdefault(alert.coin_id, _CoinAlerts())
+        if alert.direction == domain.AlertDirection.ABOVE:
+            thresholds, ids = coin.above_thresholds, coin.above_ids
+        else:
+            thresholds, ids = coin.below_thresholds, coin.below_ids
+
+        i = bisect_right(thresholds, alert.threshold)
+        thresholds.insert(i, alert.threshold)
+        ids.insert(i, alert.id)
+        self._alerts[alert.id] = alert
+
+    def remove(
+        self,
+        alert_id: int
+    ) -> Optional[domain.PriceAlert]:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return None
+
+        coin = self._coins[alert.coin_id]
+        if alert.direction == domain.AlertDirection.ABOVE:
+            thresholds, ids = coin.above_thresholds, coin.above_ids
+        else:
+            thresholds, ids = coin.below_thresholds, coin.below_ids
+
+        start = bisect_left(thresholds, alert.threshold)
+        end = bisect_right(thresholds, alert.threshold)
+        i = ids.index(alert_id, start, end)
+        del thresholds[i], ids[i]
+
+        if not coin:
+            del self._coins[alert.coin_id]
+        return alert
+
+    def check(
+        self,
+        prices: Mapping[str, float]
+    ) -> List[domain.PriceAlert]:
+        """
+        Removes alerts triggered by prices from index and returns them
+        """
+        triggered_ids: List[int] = []
+        for coin_id, price in prices.items():
+            coin = self._coins.get(coin_id)
+            if coin is None:
+                continue
+
+            i = bisect_right(coin.above_thresholds, price)
+            if i:
+                triggered_ids.extend(coin.above_ids[:i])
+                del coin.above_thresholds[:i], coin.above_ids[:i]
+
+            i = bisect_left(coin.below_thresholds, price)
+            if i < len(coin.below_ids):
+                triggered_ids.extend(coin.below_ids[i:])
+                del coin.below_thresholds[i:], coin.below_ids[i:]
+
+            if not coin:
+                del self._coins[coin_id]
+
+        return [self._alerts.pop(alert_id) for alert_id in triggered_ids]
+
+
+class PriceAlertService:
+    """
+    Keeps alerts in table and in shared in-memory index. on_prices is called
+    with every batch of refreshed prices, triggered alerts are passed to
+    notifier and deleted
+    """
+
+    _provider: PriceAlertsProvider
+    _s_assets: AssetsService
+
+    _index = PriceAlertIndex()
+    _notifier: Optional[Callable[[domain.PriceAlert, float], Awaitable]] = None
+
+    def __init__(self):
+        self._provider = PriceAlertsProvider()
+        self._s_assets = AssetsService()
+
+    @classmethod
+    def set_notifier(
+        cls,
+        notifier: Callable[[domain.PriceAlert, float], Awaitable]
+    ) -> None:
+        cls._notifier = staticmethod(notifier)
+
+    @property
+    def coin_ids(self) -> List[str]:
+        return self._index.coin_ids
+
+    async def resolve_coin(
+        self,
+        crypto_name: str
+    ) -> Union[domain.Coin, AssetNameIncorrect, AssetPriceUnavailable]:
+        return await self._s_assets.resolve_coin(crypto_name=crypto_name)
+
+    async def load(self) -> None:
+        alerts = await self._provider.select()
+        self._index.rebuild(alerts.items)
+        logger.info('Price alerts loaded: %s', len(self._index))
+
+    async def get_alerts(
+        self,
+        tg_id: int
+    ) -> domain.PriceAlertList:
+        return await self._provider.select(
+            order_by='id',
+            filters={
+                'tg_id': tg_id
+            }
+        )
+
+    async def add_alert(
+        self,
+        tg_id: int,
+        crypto_name: str,
+        threshold: float
+    ) -> Union[domain.PriceAlert, AssetNameIncorrect, AssetPriceUnavailable]:
+        """
+        Direction of alert is defined by current price, so alert triggers
+        when price crosses threshold
+        """
+        coin = await self._s_assets.resolve_coin(crypto_name=crypto_name)
+        if type(coin) is not domain.Coin:
+            return coin
+
+        crypto_info = await self._s_assets.get_crypto_info(crypto_name=coin.id)
+        if type(crypto_info) is not domain.CryptoInfo:
+            return crypto_info
+
+        direction = domain.AlertDirection.ABOVE
+        if threshold < crypto_info.price:
+            direction = domain.AlertDirection.BELOW
+
+        alert = await self._provider.insert(
+            tg_id=tg_id,
+            coin_id=coin.id,
+            threshold=threshold,
+            direction=direction.value
+        )
+        self._index.add(alert)
+        return alert
+
+    async def delete_alert(
+        self,
+        tg_id: int,
+        alert_id: int
+    ) -> bool:
+        async with unit_of_work():
+            alerts = await self._provider.select(
+                filters={
+                    'id': alert_id,
+                    'tg_id': tg_id
+                }
+            )
+            if not alerts.items:
+                return False
+
+            await self._provider.delete(
+                filters={
+                    'id': alert_id,
+                    'tg_id': tg_id
+                }
+            )
+        self._index.remove(alert_id)
+        return True
+
+    async def on_prices(
+        self,
+        prices: Mapping[str, float]
+    ) -> None:
+        triggered = self._index.check(prices)
+        if not triggered:
+            return
+
+        await self._provider.delete(
+            filters={
+                'id__in': [alert.id for alert in triggered]
+            }
+        )
+        for alert in triggered:
+            if self._notifier is None:
+                continue
+            try:
+                await self._notifier(alert, prices[alert.coin_id])
+            except Exception:
+                logger.exception('Price alert %s notification failed', alert.id)
+
+
+price_alert_service = PriceAlertService()
@@ -1,92 +1,179 @@
-from typing import Union
-
-import requests
+from typing import List, Optional, Union
 
+from settings import settings
 from source.service import domain
-from source.provider.assets import AssetsProvider
-from source.provider.serializer import data_to_crypto_info
-from source.provider.exception import AssetAlreadyExist, AssetNameIncorrect, AssetNotExist
+from source.session import unit_of_work
+from source.provider.holdings import HoldingsProvider
+from source.provider.coingecko import CoinGeckoProvider
+from source.provider.shared.cache import TTLCache, CacheStats
+from .prices import price_store
+from .catalog import coin_catalog
+from .scheduler import coingecko_scheduler, Priority
+from source.provider.serializer import data_to_crypto_info, data_to_portfolio, coin_to_crypto_info, holdings_to_assets
+from source.provider.exception import (
+    AssetAlreadyExist, AssetNameIncorrect, AssetNotExist, AssetPriceUnavailable, PriceNotFound, UpstreamError
+)
 
 
 class AssetsService:
 
-    _provider: AssetsProvider
+    _holdings: HoldingsProvider
+    _coingecko: CoinGeckoProvider
+
+    # shared by all service instances, keys are coin ids
+    _crypto_info_cache = TTLCache(
+        ttl=settings.PRICE_CACHE_TTL,
+        stale_ttl=settings.PRICE_CACHE_STALE_TTL,
+        max_size=settings.PRICE_CACHE_MAX_SIZE,
+    )
 
     def __init__(self):
-        self._provider = AssetsProvider()
+        self._holdings = HoldingsProvider()
+        self._coingecko = CoinGeckoProvider()
 
     async def get_crypto_info(
         self,
         crypto_name: str
-    ) -> Union[domain.CryptoInfo, AssetNameIncorrect]:
+    ) -> Union[domain.CryptoInfo, AssetNameIncorrect, AssetPriceUnavailable]:
+        coin = coin_catalog.resolve(crypto_name)
+        if coin is not None:
+            crypto_name = coin.id
+
         try:
-            url = f'https://api.coingecko.com/api/v3/coins/{crypto_name}'
-            response = requests.get(url).json()
-            crypto_info = await data_to_crypto_info(response)
+            crypto_info = await self._crypto_info_cache.get_or_fetch(
+                crypto_name,
+                lambda: self._fetch_crypto_info(crypto_name)
+            )
         except KeyError:
             return AssetNameIncorrect()
+        except (UpstreamError, PriceNotFound):
+            return AssetPriceUnavailable()
 
         return crypto_info
 
-    async def get_crypto_assets(
+    async def resolve_coin(
         self,
-        tg_id: int
-    ) -> domain.Assets:
-
-        return await self._provider.get(
-            filters={
-                'tg_id': tg_id,
-                'type': domain.AssetsTypes.CRYPTO.value
-            }
-        )
+        crypto_name: str
+    ) -> Union[domain.Coin, AssetNameIncorrect, AssetPriceUnavailable]:
+        """
+        Resolves coin by id, name, symbol or alias in local coin catalog.
+        While catalog is not loaded coin is validated by request to CoinGecko,
+        name is taken as coin id, so it's stripped and lowercased
+        """
+        if coin_catalog.loaded:
+            coin = coin_catalog.resolve(crypto_name)
+            if coin is None:
+                return AssetNameIncorrect()
+            return coin
+
+        crypto_name = crypto_name.strip().lower()
+        crypto_info = await self.get_crypto_info(crypto_name=crypto_name)
+        if type(crypto_info) is not domain.CryptoInfo:
+            return crypto_info
+        return domain.Coin(id=crypto_name, symbol=crypto_info.symbol, name=crypto_info.name)
 
-    async def add_crypto_asset(
+    def suggest_coins(
         self,
-        tg_id: int,
-        crypto_name: str,
-        value: float
-    ) -> Union[domain.Assets, AssetAlreadyExist, AssetNameIncorrect]:
-
-        assets = await self.get_crypto_assets(tg_id=tg_id)
-        if assets.assets.get(crypto_name):
-            return AssetAlreadyExist()
-
-        crypto_info = await self.get_crypto_info(crypto_name=crypto_name)
-        if type(crypto_info) is AssetNameIncorrect:
-            return AssetNameIncorrect()
+        crypto_name: str
+    ) -> List[domain.Coin]:
+        return coin_catalog.suggest(crypto_name)
 
-        assets.assets[crypto_name] = value
-        new_assets = await self._provider.update(
-            assets=assets.assets,
-            filters={
-                'tg_id': tg_id,
-                'type': domain.AssetsTypes.CRYPTO.value
-            }
-        )
-        return new_assets
+    async def _fetch_crypto_info(
+        self,
+        crypto_name: str
+    ) -> domain.CryptoInfo:
+        """
+        Name and symbol of catalog coins are taken from coin catalog and price
+        from price store or from price-only request. Coin document is
+        requested only for coins which are absent in catalog.
+        Raises KeyError if coin does not exist and PriceNotFound if price
+        API has no price of catalog coin
+        """
+        coin = coin_catalog.get(crypto_name)
+        if coin is None:
+            response = await coingecko_scheduler.submit(
+                lambda: self._coingecko.get_coin(crypto_name),
+                priority=Priority.INTERACTIVE
+            )
+            return await data_to_crypto_info(response)
+
+        price = price_store.get(coin.id)
+        if price is None:
+            prices = await coingecko_scheduler.submit(
+                lambda: self._coingecko.get_prices([coin.id]),
+                priority=Priority.INTERACTIVE
+            )
+            price_store.update(prices)
+            price = prices.get(coin.id)
+            if price is None:
+                raise PriceNotFound(coin.id)
+
+        return await coin_to_crypto_info(coin, price)
+
+    @property
+    def crypto_info_cache_stats(self) -> CacheStats:
+        return self._crypto_info_cache.stats
 
-    async def create_record_for_new_user(
+    async def get_crypto_assets(
         self,
         tg_id: int
-    ):
+    ) -> domain.Assets:
 
-        await self._provider.insert(
+        holdings = await self._holdings.select_by_user(
             tg_id=tg_id,
-            type=domain.AssetsTypes.CRYPTO.value,
-            assets={}
+            asset_type=domain.AssetsTypes.CRYPTO.value
         )
+        return await holdings_to_assets(tg_id, domain.AssetsTypes.CRYPTO, holdings.items)
 
-        await self._provider.insert(
-            tg_id=tg_id,
-            type=domain.AssetsTypes.STOCK.value,
-            assets={}
-        )
+    async def get_crypto_portfolio(
+        self,
+        tg_id: int
+    ) -> domain.Portfolio:
+        """
+        Values every crypto holding of user. Prices are read from price store,
+        prices missing there are fetched by one request. If price API is
+        unavailable holdings without known price are left without value
+        """
+        assets = await self.get_crypto_assets(tg_id=tg_id)
+        coin_ids = (assets.assets or {}).keys()
+
+        prices = price_store.get_many(coin_ids)
+        missing = [coin_id for coin_id in coin_ids if coin_id not in prices]
+        if missing:
+            try:
+                fetched = await coingecko_scheduler.submit(
+                    lambda: self._coingecko.get_prices(missing),
+                    priority=Priority.INTERACTIVE
+                )
+            except UpstreamError:
+                fetched = {}
+            price_store.update(fetched)
+            prices.update(fetched)
+
+        return await data_to_portfolio(assets, prices)
 
-        await self._provider.insert(
-            tg_id=tg_id,
-            type=domain.AssetsTypes.OTHER.value,
-            assets={}
-        )
+    async def add_crypto_asset(
+        self,
+        tg_id: int,
+        crypto_name: str,
+        value: float
+    ) -> Union[domain.Assets, AssetAlreadyExist, AssetNameIncorrect, AssetPriceUnavailable]:
+
+        coin = await self.resolve_coin(crypto_name=crypto_name)
+        if type(coin) is not domain.Coin:
+            return coin
+        crypto_name = coin.id
+
+        async with unit_of_work():
+            holding = await self._holdings.add(
+                tg_id=tg_id,
+                asset_type=domain.AssetsTypes.CRYPTO.value,
+                coin_id=crypto_name,
+                quantity=value
+            )
+            if holding is None:
+                return AssetAlreadyExist()
+            return await self.get_crypto_assets(tg_id=tg_id)
 
     async def update_crypto_asset(
         self,
@@ -95,21 +182,67 @@ class AssetsService:
         value: float
     ) -> Union[domain.Assets, AssetNameIncorrect, AssetNotExist]:
 
-        assets = await self._provider.get(
-            filters={
-                'tg_id': tg_id,
-                'type': domain.AssetsTypes.CRYPTO.value
-            }
-        )
+        async with unit_of_work():
+            holding = await self._holdings.set_quantity(
+                tg_id=tg_id,
+                asset_type=domain.AssetsTypes.CRYPTO.value,
+                coin_id=crypto_name,
+                quantity=value
+            )
+            if holding is None:
+                return AssetNotExist()
+            return await self.get_crypto_assets(tg_id=tg_id)
+
+    async def increment_crypto_asset(
+        self,
+        tg_id: int,
+        crypto_name: str,
+        delta: float
+    ) -> domain.Assets:
+
+        async with unit_of_work():
+            await self._holdings.increment(
+                tg_id=tg_id,
+                asset_type=domain.AssetsTypes.CRYPTO.value,
+                coin_id=crypto_name,
+                delta=delta
+            )
+            return await self.get_crypto_assets(tg_id=tg_id)
 
-        if not assets.assets.get(crypto_name):
-            return AssetNotExist()
+    async def remove_crypto_asset(
+        self,
+        tg_id: int,
+        crypto_name: str
+    ) -> Union[domain.Assets, AssetNotExist]:
 
-        assets.assets[crypto_name] = value
-        return await self._provider.update(
-            assets=assets.assets,
-            filters={
+        async with unit_of_work():
+            removed = await self._holdings.delete_many([{
                 'tg_id': tg_id,
-                'type': domain.AssetsTypes.CRYPTO.value
-            }
+                'asset_type': domain.AssetsTypes.CRYPTO.value,
+                'coin_id': crypto_name
+            }])
+            if not removed.items:
+                return AssetNotExist()
+            return await self.get_crypto_assets(tg_id=tg_id)
+
+    async def get_crypto_holders(
+        self,
+        crypto_name: str
+    ) -> List[int]:
+
+        return await self._holdings.select_holders(
+            coin_id=crypto_name,
+            asset_type=domain.AssetsTypes.CRYPTO.value
+        )
+
+    async def get_crypto_totals(
+        self,
+        crypto_names: Optional[List[str]] = None
+    ) -> List[domain.CoinHoldingTotal]:
+        """
+        Returns total quantity held by all users and number of holders of every coin
+        """
+        return await self._holdings.select_coin_totals(
+            asset_type=domain.AssetsTypes.CRYPTO.value,
+            coin_ids=crypto_names
         )
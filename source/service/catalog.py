@@ -0,0 +1,169 @@
+import difflib
+import logging
+import os
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import orjson as json
+
+from settings import settings
+from source.service import domain
+from source.provider.coingecko import CoinGeckoProvider
+from source.provider.serializer import data_to_coins
+from .scheduler import coingecko_scheduler, Priority
+
+
+logger = logging.getLogger(__name__)
+
+
+class CoinCatalog:
+    """
+    In-memory catalog of coins which resolves coin by id, name, symbol or
+    alias without network requests.
+
+    _by_id: coin id -> coin
+    _by_key: normalized id, name, unique symbol or alias -> coin id.
+    Symbols shared by several coins are not indexed, such coins are resolved
+    by id, name or alias only
+    _grams: trigram -> keys of _by_key which contain it, it is used to find
+    candidates for suggestions
+    """
+
+    GRAM_SIZE = 3
+    SUGGESTIONS_CANDIDATES = 50
+    SUGGESTIONS_MIN_RATIO = 0.6
+
+    def __init__(self):
+        self._by_id: Dict[str, domain.Coin] = {}
+        self._by_key: Dict[str, str] = {}
+        self._grams: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def loaded(self) -> bool:
+        return bool(self._by_id)
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return ' '.join(text.lower().split())
+
+    @classmethod
+    def _make_grams(cls, key: str) -> List[str]:
+        padded = f'  {key} '
+        return [padded[i:i + cls.GRAM_SIZE] for i in range(len(padded) - cls.GRAM_SIZE + 1)]
+
+    def load(
+        self,
+        coins: Iterable[domain.Coin],
+        aliases: Dict[str, str] = settings.COIN_CATALOG_ALIASES
+    ) -> None:
+        """
+        Rebuilds all indexes from passed coins
+        """
+        by_id: Dict[str, domain.Coin] = {}
+        for coin in coins:
+            by_id[coin.id] = coin
+
+        by_key: Dict[str, str] = {}
+        symbols = Counter(self._normalize(coin.symbol) for coin in by_id.values())
+        for coin in by_id.values():
+            symbol = self._normalize(coin.symbol)
+            if symbols[symbol] == 1:
+                by_key.setdefault(symbol, coin.id)
+        for coin in by_id.values():
+            by_key[self._normalize(coin.name)] = coin.id
+        for coin_id in by_id:
+            by_key[self._normalize(coin_id)] = coin_id
+        for alias, coin_id in aliases.items():
+            coin = by_id.get(coin_id)
+            if coin is not None:
+                by_key[self._normalize(alias)] = coin_id
+                coin.aliases.append(alias)
+
+        grams: Dict[str, List[str]] = {}
+        for key in by_key:
+            for gram in set(self._make_grams(key)):
+                grams.setdefault(gram, []).append(key)
+
+        self._by_id, self._by_key, self._grams = by_id, by_key, grams
+
+    def get(
+        self,
+        coin_id: str
+    ) -> Optional[domain.Coin]:
+        return self._by_id.get(coin_id)
+
+    def resolve(
+        self,
+        text: str
+    ) -> Optional[domain.Coin]:
+        """
+        Returns coin by exact id, name, unique symbol or alias
+        """
+        coin_id = self._by_key.get(self._normalize(text))
+        if coin_id is None:
+            return None
+        return self._by_id[coin_id]
+
+    def suggest(
+        self,
+        text: str,
+        limit: int = settings.COIN_CATALOG_SUGGESTIONS_LIMIT
+    ) -> List[domain.Coin]:
+        """
+        Returns coins which keys are most similar to text, best match first.
+        Candidates are keys sharing most trigrams with text, they are ranked
+        by difflib similarity ratio
+        """
+        query = self._normalize(text)
+        overlap = Counter()
+        for gram in set(self._make_grams(query)):
+            overlap.update(self._grams.get(gram, ()))
+
+        ranked = []
+        for key, _ in overlap.most_common(self.SUGGESTIONS_CANDIDATES):
+            ratio = difflib.SequenceMatcher(None, query, key).ratio()
+            if ratio >= self.SUGGESTIONS_MIN_RATIO:
+                ranked.append((ratio, key))
+        ranked.sort(reverse=True)
+
+        suggested_ids: List[str] = []
+        for _, key in ranked:
+            coin_id = self._by_key[key]
+            if coin_id not in suggested_ids:
+                suggested_ids.append(coin_id)
+            if len(suggested_ids) == limit:
+                break
+        return [self._by_id[coin_id] for coin_id in suggested_ids]
+
+
+coin_catalog = CoinCatalog()
+
+
+async def load_coin_catalog(
+    catalog: CoinCatalog = coin_catalog,
+    path: str = settings.COIN_CATALOG_PATH,
+    max_age: float = settings.COIN_CATALOG_MAX_AGE
+) -> None:
+    """
+    Loads catalog from local file, if file is missing or older than max_age
+    fetches coins list from CoinGecko and saves it to the file
+    """
+    response = None
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+        with open(path, 'rb') as file:
+            response = json.loads(file.read())
+
+    if response is None:
+        response = await coingecko_scheduler.submit(
+            CoinGeckoProvider().get_coins_list,
+            priority=Priority.BACKGROUND
+        )
+        with open(path, 'wb') as file:
+            file.write(json.dumps(response))
+
+    catalog.load(await data_to_coins(response))
+    logger.info('Coin catalog loaded: %s coins', len(catalog))
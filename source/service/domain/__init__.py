@@ -1,3 +1,5 @@
 from .base import *
 from .user import *
 from .assets import *
+from .prices import *
+from .alerts import *
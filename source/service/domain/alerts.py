@@ -0,0 +1,20 @@
+from enum import IntEnum
+from typing import List
+from pydantic import BaseModel
+
+
+class AlertDirection(IntEnum):
+    ABOVE = 0
+    BELOW = 1
+
+
+class PriceAlert(BaseModel):
+    id: int
+    tg_id: int
+    coin_id: str
+    threshold: float
+    direction: AlertDirection
+
+
+class PriceAlertList(BaseModel):
+    items: List[PriceAlert] = []
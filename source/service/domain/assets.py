@@ -1,3 +1,4 @@
+import datetime
 from enum import IntEnum
 from typing import List, Optional
 from pydantic import BaseModel
@@ -19,7 +20,64 @@ class AssetsList(BaseModel):
     items: List[Assets] = []
 
 
+class Holding(BaseModel):
+    tg_id: int
+    asset_type: AssetsTypes
+    coin_id: str
+    quantity: float
+
+
+class HoldingsList(BaseModel):
+    items: List[Holding] = []
+
+
+class CoinHoldingTotal(BaseModel):
+    coin_id: str
+    quantity: float
+    holders: int
+
+
 class CryptoInfo(BaseModel):
     name: str
     symbol: str
     price: float
+
+
+class PortfolioItem(BaseModel):
+    name: str
+    value: float
+    price: Optional[float]
+    total: Optional[float]
+
+
+class Portfolio(BaseModel):
+    tg_id: int
+    items: List[PortfolioItem] = []
+    total: float = 0
+
+
+class Coin(BaseModel):
+    id: str
+    symbol: str
+    name: str
+    aliases: List[str] = []
+
+
+class PortfolioSnapshot(BaseModel):
+    tg_id: int
+    total_value: float
+    created_at: datetime.datetime
+
+
+class PortfolioSnapshotList(BaseModel):
+    items: List[PortfolioSnapshot] = []
+
+
+class ValuationReport(BaseModel):
+    users: int
+    holdings: int
+    coins: int
+    priced_coins: int
+    total_value: float
+    seconds: float
+    users_per_second: float
@@ -0,0 +1,31 @@
+import datetime
+from enum import IntEnum
+from typing import List
+from pydantic import BaseModel
+
+
+class PriceResolution(IntEnum):
+    MINUTE = 60
+    HOUR = 60 * 60
+    DAY = 24 * 60 * 60
+
+
+class PriceTick(BaseModel):
+    coin_id: str
+    price: float
+    time: datetime.datetime
+
+
+class PriceCandle(BaseModel):
+    coin_id: str
+    resolution: PriceResolution
+    bucket: datetime.datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    ticks: int
+
+
+class PriceCandleList(BaseModel):
+    items: List[PriceCandle] = []
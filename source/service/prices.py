@@ -0,0 +1,247 @@
+import asyncio
+import datetime
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from settings import settings
+from source.service import domain
+from source.provider.holdings import HoldingsProvider
+from source.provider.coingecko import CoinGeckoProvider
+from source.provider.prices import PriceHistoryProvider
+from .scheduler import coingecko_scheduler, Priority
+
+
+logger = logging.getLogger(__name__)
+
+
+class PriceStore:
+    """
+    In-process store of last known coin prices, it is filled by
+    PriceRefresher and read by services without network requests
+    """
+
+    def __init__(self):
+        self._prices: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def get(
+        self,
+        coin_id: str,
+        max_age: Optional[float] = settings.PRICE_STORE_MAX_AGE
+    ) -> Optional[float]:
+        """
+        Returns price of coin if it's known and not older than max_age seconds
+        """
+        entry = self._prices.get(coin_id)
+        if entry is None:
+            return None
+
+        price, updated_at = entry
+        if max_age is not None and time.monotonic() - updated_at > max_age:
+            return None
+        return price
+
+    def get_many(
+        self,
+        coin_ids: Iterable[str],
+        max_age: Optional[float] = settings.PRICE_STORE_MAX_AGE
+    ) -> Dict[str, float]:
+        prices = {}
+        for coin_id in coin_ids:
+            price = self.get(coin_id, max_age=max_age)
+            if price is not None:
+                prices[coin_id] = price
+        return prices
+
+    def update(
+        self,
+        prices: Mapping[str, float]
+    ) -> None:
+        updated_at = time.monotonic()
+        for coin_id, price in prices.items():
+            self._prices[coin_id] = (price, updated_at)
+
+
+price_store = PriceStore()
+
+
+class PriceHistoryService:
+
+    _provider: PriceHistoryProvider
+
+    def __init__(self):
+        self._provider = PriceHistoryProvider()
+
+    async def add_prices(
+        self,
+        prices: Mapping[str, float],
+        time: Optional[datetime.datetime] = None
+    ) -> int:
+        """
+        Adds prices as ticks of the same time to history rollups
+        """
+        if not prices:
+            return 0
+        if time is None:
+            time = datetime.datetime.now(datetime.timezone.utc)
+
+        return await self._provider.ingest(
+            domain.PriceTick(coin_id=coin_id, price=price, time=time)
+            for coin_id, price in prices.items()
+        )
+
+    async def get_series(
+        self,
+        coin_id: str,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        resolution: Optional[int] = None
+    ) -> domain.PriceCandleList:
+        """
+        Returns candles of coin for time range. resolution is wanted candle
+        size in seconds, the largest rollup level which is not bigger is used.
+        Without resolution the finest level which fits range into
+        PRICE_HISTORY_MAX_POINTS candles is used
+        """
+        return await self._provider.select_series(
+            coin_id=coin_id,
+            resolution=self._choose_resolution(start, end, resolution),
+            start=start,
+            end=end
+        )
+
+    @staticmethod
+    def _choose_resolution(
+        start: datetime.datetime,
+        end: datetime.datetime,
+        resolution: Optional[int] = None
+    ) -> domain.PriceResolution:
+        levels = sorted(domain.PriceResolution)
+        if resolution is not None:
+            matching = [level for level in levels if level <= resolution]
+            return matching[-1] if matching else levels[0]
+
+        span = (end - start).total_seconds()
+        for level in levels:
+            if span / level <= settings.PRICE_HISTORY_MAX_POINTS:
+                return level
+        return levels[-1]
+
+
+class PriceRefresher:
+    """
+    Background task which periodically refreshes prices of every coin held
+    by any user into price store. Coin ids are requested in chunks of
+    batch_size, at most concurrency chunks are requested at the same time.
+
+    Coin sources add coin ids to refresh besides held coins, listeners are
+    awaited with refreshed prices after every refresh
+    """
+
+    def __init__(
+        self,
+        store: PriceStore = price_store,
+        interval: float = settings.PRICE_REFRESH_INTERVAL,
+        batch_size: int = settings.PRICE_REFRESH_BATCH_SIZE,
+        concurrency: int = settings.PRICE_REFRESH_CONCURRENCY,
+    ):
+        self._store = store
+        self._interval = interval
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._holdings_provider = HoldingsProvider()
+        self._coingecko = CoinGeckoProvider()
+        self._history = PriceHistoryService()
+        self._task: Optional[asyncio.Task] = None
+        self._coin_sources: List[Callable[[], Iterable[str]]] = []
+        self._listeners: List[Callable[[Dict[str, float]], Awaitable]] = []
+
+    def add_coin_source(
+        self,
+        source: Callable[[], Iterable[str]]
+    ) -> None:
+        self._coin_sources.append(source)
+
+    def add_listener(
+        self,
+        listener: Callable[[Dict[str, float]], Awaitable]
+    ) -> None:
+        self._listeners.append(listener)
+
+    async def refresh(self) -> int:
+        """
+        Refreshes prices of all held coins, adds them to price history and
+        returns number of updated prices
+        """
+        coin_ids = set(await self._holdings_provider.select_coin_ids(
+            asset_type=domain.AssetsTypes.CRYPTO.value
+        ))
+        for source in self._coin_sources:
+            coin_ids.update(source())
+        coin_ids = sorted(coin_ids)
+
+        chunks: List[List[str]] = [
+            coin_ids[i:i + self._batch_size]
+            for i in range(0, len(coin_ids), self._batch_size)
+        ]
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        refreshed: Dict[str, float] = {}
+
+        async def refresh_chunk(chunk: List[str]) -> int:
+            async with semaphore:
+                prices = await coingecko_scheduler.submit(
+                    lambda: self._coingecko.get_prices(chunk),
+                    priority=Priority.BACKGROUND
+                )
+            self._store.update(prices)
+            refreshed.update(prices)
+            return len(prices)
+
+        results = await asyncio.gather(
+            *(refresh_chunk(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        updated = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning('Price refresh chunk failed: %r', result)
+                continue
+            updated += result
+
+        await self._history.add_prices(refreshed)
+        for listener in self._listeners:
+            try:
+                await listener(refreshed)
+            except Exception:
+                logger.exception('Price refresh listener failed')
+        return updated
+
+    async def run(self) -> None:
+        while True:
+            try:
+                updated = await self.refresh()
+                logger.info('Refreshed %s prices', updated)
+            except Exception:
+                logger.exception('Price refresh failed')
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+price_refresher = PriceRefresher()
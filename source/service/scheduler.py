@@ -0,0 +1,315 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from settings import settings
+from source.provider.exception import UpstreamError, UpstreamThrottled, UpstreamUnavailable
+
+
+T = TypeVar('T')
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    """
+    Token bucket which refills rate tokens per second up to capacity.
+    pause() empties bucket and stops refilling until passed delay expires,
+    it is used when upstream asks to slow down
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int
+    ):
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now < self._paused_until:
+            self._updated_at = now
+            return
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def delay(self) -> float:
+        """
+        Returns seconds to wait until one token is available
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self._rate
+
+    def consume(self) -> None:
+        self._tokens -= 1
+
+    def paused_for(self) -> float:
+        """
+        Returns seconds until pause expires, 0 if bucket is not paused
+        """
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def pause(self, delay: float) -> None:
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold failures in a row, while it's open requests
+    fail fast. After reset_timeout it becomes half open and lets one probe
+    request through, other requests fail fast until probe is done. Success
+    closes it, failure opens it again, probe which ends otherwise is
+    released by release_probe, so next request becomes probe
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float
+    ):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self._reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """
+        Returns True if request may be sent, in half open state only the
+        first request is allowed, it becomes probe
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN or self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release_probe(self) -> None:
+        self._probing = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class SchedulerMetrics:
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.rejected = 0
+        self.waits = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, wait: float) -> None:
+        self.waits += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def avg_wait(self) -> float:
+        if not self.waits:
+            return 0.0
+        return self.total_wait / self.waits
+
+
+class OutboundScheduler:
+    """
+    Schedules requests to external API:
+    - every attempt takes a token from token bucket, waiting attempts are
+    served by priority, so interactive requests go ahead of background ones
+    - UpstreamError is retried max_retries times with exponential backoff
+    and full jitter, throttled response pauses whole bucket for Retry-After.
+    Interactive requests don't wait for retry or paused bucket longer than
+    interactive_backoff_max, they fail fast with UpstreamThrottled instead
+    - circuit breaker rejects requests with UpstreamUnavailable while
+    upstream keeps failing, throttling is not counted as failure
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = settings.COINGECKO_RATE_LIMIT_PER_MINUTE,
+        burst: int = settings.COINGECKO_RATE_LIMIT_BURST,
+        max_retries: int = settings.COINGECKO_MAX_RETRIES,
+        backoff_base: float = settings.COINGECKO_BACKOFF_BASE,
+        backoff_max: float = settings.COINGECKO_BACKOFF_MAX,
+        interactive_backoff_max: float = settings.COINGECKO_INTERACTIVE_BACKOFF_MAX,
+        breaker_failure_threshold: int = settings.COINGECKO_BREAKER_FAILURE_THRESHOLD,
+        breaker_reset_timeout: float = settings.COINGECKO_BREAKER_RESET_TIMEOUT,
+    ):
+        self._bucket = TokenBucket(rate=rate_per_minute / 60, capacity=burst)
+        self._breaker = CircuitBreaker(
+            failure_threshold=breaker_failure_threshold,
+            reset_timeout=breaker_reset_timeout
+        )
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._interactive_backoff_max = interactive_backoff_max
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.metrics = SchedulerMetrics()
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(priority).name.lower()] += 1
+        return {
+            'queue_depth': depth,
+            'requests': self.metrics.requests,
+            'retries': self.metrics.retries,
+            'throttled': self.metrics.throttled,
+            'failures': self.metrics.failures,
+            'rejected': self.metrics.rejected,
+            'avg_wait': self.metrics.avg_wait,
+            'max_wait': self.metrics.max_wait,
+            'breaker': self._breaker.state,
+        }
+
+    async def submit(
+        self,
+        request: Callable[[], Awaitable[T]],
+        priority: Priority = Priority.INTERACTIVE
+    ) -> T:
+        """
+        Awaits request() when it's its turn and retries it on UpstreamError
+        """
+        self.metrics.requests += 1
+        attempt = 0
+        while True:
+            paused_for = self._bucket.paused_for()
+            if priority == Priority.INTERACTIVE and paused_for > self._interactive_backoff_max:
+                self.metrics.rejected += 1
+                raise UpstreamThrottled('Rate limit is paused', retry_after=paused_for)
+
+            probe = self._breaker.state == CircuitBreaker.HALF_OPEN
+            if not self._breaker.allow():
+                self.metrics.rejected += 1
+                raise UpstreamUnavailable('Circuit breaker is open')
+
+            try:
+                await self._acquire(priority)
+                result = await request()
+            except UpstreamError as e:
+                self._on_failure(e)
+                if probe:
+                    self._breaker.release_probe()
+                backoff = self._get_backoff(attempt + 1, e, priority)
+                if attempt >= self._max_retries or backoff is None:
+                    raise
+                attempt += 1
+                self.metrics.retries += 1
+                await asyncio.sleep(backoff)
+                continue
+            except BaseException:
+                if probe:
+                    self._breaker.release_probe()
+                raise
+
+            self._breaker.record_success()
+            return result
+
+    def _on_failure(self, error: UpstreamError) -> None:
+        """
+        Throttling pauses token bucket, other errors are counted by breaker
+        """
+        if isinstance(error, UpstreamThrottled):
+            self.metrics.throttled += 1
+            self._bucket.pause(error.retry_after or self._backoff_base)
+            return
+        self.metrics.failures += 1
+        self._breaker.record_failure()
+
+    def _get_backoff(
+        self,
+        attempt: int,
+        error: UpstreamError,
+        priority: Priority
+    ) -> Optional[float]:
+        """
+        Returns seconds to wait before retry, None if interactive request
+        must fail instead of waiting Retry-After longer than interactive_backoff_max
+        """
+        backoff_max = self._backoff_max
+        if priority == Priority.INTERACTIVE:
+            backoff_max = min(backoff_max, self._interactive_backoff_max)
+            if error.retry_after is not None and error.retry_after > backoff_max:
+                return None
+        if error.retry_after is not None:
+            return error.retry_after
+        return random.uniform(0, min(backoff_max, self._backoff_base * 2 ** attempt))
+
+    async def _acquire(self, priority: Priority) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started_at = time.monotonic()
+        await future
+        self.metrics.record_wait(time.monotonic() - started_at)
+
+    async def _dispatch(self) -> None:
+        """
+        Hands out tokens to waiters in order of priority, then arrival
+        """
+        while self._waiters:
+            delay = self._bucket.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            *_, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._bucket.consume()
+            future.set_result(None)
+
+
+coingecko_scheduler = OutboundScheduler()
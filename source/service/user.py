@@ -1,20 +1,107 @@
+import asyncio
+import contextvars
 import datetime
+import logging
+from typing import Dict, Optional, Set, Tuple
 
+from settings import settings
 from source.service import domain
+from source.session import unit_of_work
 from source.provider.user import UsersProvider
-from .assets import AssetsService
+
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    """
+    Write-behind buffer of users last activity. Only the latest time of
+    every tg_id is kept, buffer is flushed by one bulk update every
+    flush_interval seconds or when it reaches flush_size users, and is
+    drained on stop. If flush fails times are returned to buffer unless
+    newer ones were recorded meanwhile
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = settings.USER_ACTIVITY_FLUSH_INTERVAL,
+        flush_size: int = settings.USER_ACTIVITY_FLUSH_SIZE,
+    ):
+        self._flush_interval = flush_interval
+        self._flush_size = flush_size
+        self._provider = UsersProvider()
+        self._last_activities: Dict[int, datetime.datetime] = {}
+        # lock is created by first flush, so it's bound to running loop
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._last_activities)
+
+    def record(
+        self,
+        tg_id: int,
+        last_activity: datetime.datetime
+    ) -> None:
+        self._last_activities[tg_id] = last_activity
+        if len(self._last_activities) >= self._flush_size and not self._flush_tasks:
+            # task is created in empty context, otherwise it would copy unit
+            # of work of caller and flush in its session, which may be closed
+            task = contextvars.Context().run(asyncio.create_task, self.flush())
+            # keep reference until task is done
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> int:
+        """
+        Writes buffered times, returns number of updated users
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            last_activities, self._last_activities = self._last_activities, {}
+            try:
+                return await self._provider.touch_last_activity_many(last_activities)
+            except Exception as e:
+                logger.warning('Activity of %s users is not flushed: %r', len(last_activities), e)
+                for tg_id, last_activity in last_activities.items():
+                    self._last_activities.setdefault(tg_id, last_activity)
+                return 0
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+
+
+activity_buffer = ActivityBuffer()
 
 
 class UserService:
 
     _provider: UsersProvider
-    _s_assets: AssetsService
 
     def __init__(self):
         self._provider = UsersProvider()
-        self._s_assets = AssetsService()
 
-    async def create(
+    async def register(
         self,
         tg_id: int,
         username: str,
@@ -26,32 +113,42 @@ class UserService:
         can_join_groups: bool,
         can_read_all_group_messages: bool,
         supports_inline_queries: bool,
-        is_superuser: bool,
-        last_activity: datetime.datetime,
-        registration_date: datetime.datetime,
         phone_number: int = ...
-    ) -> domain.Users:
-
-        user = await self._provider.insert(
-            tg_id=tg_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name,
-            is_bot=is_bot,
-            language_code=language_code,
-            added_to_attachment_menu=added_to_attachment_menu,
-            can_join_groups=can_join_groups,
-            can_read_all_group_messages=can_read_all_group_messages,
-            supports_inline_queries=supports_inline_queries,
-            is_superuser=is_superuser,
-            last_activity=last_activity,
-            registration_date=registration_date,
-            phone_number=phone_number
-        )
+    ) -> Tuple[domain.Users, bool]:
+        """
+        Returns user and True if user was created. Existing user is read
+        by one prepared statement and the activity is recorded in
+        activity_buffer, so repeated /start doesn't write. Unknown user is
+        created with assets records by one statement, which is idempotent
+        on tg_id. User is read in unit of work with writes, so it's read
+        from primary, replica may not have just registered user yet
+        """
+        now = datetime.datetime.now()
+        async with unit_of_work():
+            user = await self._provider.find_by_tg_id(tg_id)
+            if user is None:
+                return await self._provider.register(
+                    values={
+                        'tg_id': tg_id,
+                        'username': username,
+                        'first_name': first_name,
+                        'last_name': last_name,
+                        'is_bot': is_bot,
+                        'language_code': language_code,
+                        'added_to_attachment_menu': added_to_attachment_menu,
+                        'can_join_groups': can_join_groups,
+                        'can_read_all_group_messages': can_read_all_group_messages,
+                        'supports_inline_queries': supports_inline_queries,
+                        'is_superuser': False,
+                        'last_activity': now,
+                        'registration_date': now,
+                        'phone_number': phone_number
+                    },
+                    asset_types=[assets_type.value for assets_type in domain.AssetsTypes]
+                )
 
-        await self._s_assets.create_record_for_new_user(tg_id)
-
-        return user
+        activity_buffer.record(tg_id, now)
+        return user, False
 
     async def get(
         self,
@@ -59,6 +156,9 @@ class UserService:
         phone_number: int = ...
     ) -> domain.Users:
 
+        if phone_number is ... and tg_id is not ...:
+            return await self._provider.get_by_tg_id(tg_id)
+
         return await self._provider.get(
             filters={
                 'tg_id': tg_id,
@@ -82,9 +182,7 @@ class UserService:
         self,
         tg_id: int
     ):
-        await self._provider.update(
-            last_activity=datetime.datetime.now(),
-            filters={
-                'tg_id': tg_id
-            }
-        )
+        """
+        Records activity in activity_buffer, it's written to db by next flush
+        """
+        activity_buffer.record(tg_id, datetime.datetime.now())
@@ -0,0 +1,156 @@
+import asyncio
+import datetime
+import logging
+import time
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from settings import settings
+from source.service import domain
+from source.provider.holdings import HoldingsProvider
+from source.provider.coingecko import CoinGeckoProvider
+from source.provider.portfolio import PortfolioSnapshotsProvider
+from source.provider.exception import UpstreamError
+from .prices import price_store
+from .scheduler import coingecko_scheduler, Priority
+
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioValuationJob:
+    """
+    Values crypto portfolios of all users and saves totals as snapshots.
+
+    Holdings rows are streamed by keyset chunks and every holding is appended to flat
+    arrays of user index, coin index and quantity, tg ids and coin ids are
+    mapped to integer indexes. Then all holdings are valued by one vectorized multiply
+    with price array and summed per user by np.bincount.
+    Holdings of coins without known price are valued as 0
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = settings.PORTFOLIO_VALUATION_CHUNK_SIZE,
+        valuation_hour: int = settings.PORTFOLIO_VALUATION_HOUR,
+    ):
+        self._chunk_size = chunk_size
+        self._valuation_hour = valuation_hour
+        self._holdings_provider = HoldingsProvider()
+        self._snapshots_provider = PortfolioSnapshotsProvider()
+        self._coingecko = CoinGeckoProvider()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _get_prices(
+        self,
+        coin_ids: List[str]
+    ) -> Dict[str, float]:
+        prices = price_store.get_many(coin_ids)
+        missing = [coin_id for coin_id in coin_ids if coin_id not in prices]
+        for i in range(0, len(missing), settings.PRICE_REFRESH_BATCH_SIZE):
+            chunk = missing[i:i + settings.PRICE_REFRESH_BATCH_SIZE]
+            try:
+                fetched = await coingecko_scheduler.submit(
+                    lambda: self._coingecko.get_prices(chunk),
+                    priority=Priority.BACKGROUND
+                )
+            except UpstreamError as e:
+                logger.warning('Prices of %s coins are not fetched: %r', len(chunk), e)
+                continue
+            price_store.update(fetched)
+            prices.update(fetched)
+        return prices
+
+    async def run(self) -> domain.ValuationReport:
+        started_at = time.perf_counter()
+        created_at = datetime.datetime.now(datetime.timezone.utc)
+
+        tg_ids = array('q')
+        user_indexes = array('q')
+        coin_indexes = array('q')
+        quantities = array('d')
+        user_index: Dict[int, int] = {}
+        coin_index: Dict[str, int] = {}
+
+        async for holdings in self._holdings_provider.stream(
+            chunk_size=self._chunk_size,
+            filters={
+                'asset_type': domain.AssetsTypes.CRYPTO.value
+            }
+        ):
+            for holding in holdings.items:
+                index = user_index.get(holding.tg_id)
+                if index is None:
+                    index = user_index[holding.tg_id] = len(tg_ids)
+                    tg_ids.append(holding.tg_id)
+                user_indexes.append(index)
+                coin_indexes.append(coin_index.setdefault(holding.coin_id, len(coin_index)))
+                quantities.append(holding.quantity)
+
+        prices = await self._get_prices(list(coin_index))
+        price_array = np.zeros(len(coin_index), dtype=np.float64)
+        for coin_id, price in prices.items():
+            price_array[coin_index[coin_id]] = price
+
+        values = np.frombuffer(quantities, dtype=np.float64) * price_array[np.frombuffer(coin_indexes, dtype=np.int64)]
+        totals = np.bincount(
+            np.frombuffer(user_indexes, dtype=np.int64),
+            weights=values,
+            minlength=len(tg_ids)
+        )
+
+        await self._snapshots_provider.insert_snapshots(
+            tg_ids=tg_ids,
+            total_values=totals.tolist(),
+            created_at=created_at
+        )
+
+        seconds = time.perf_counter() - started_at
+        report = domain.ValuationReport(
+            users=len(tg_ids),
+            holdings=len(quantities),
+            coins=len(coin_index),
+            priced_coins=len(prices),
+            total_value=float(totals.sum()),
+            seconds=seconds,
+            users_per_second=len(tg_ids) / seconds if seconds else 0.0
+        )
+        logger.info(
+            'Valued %s portfolios in %.2fs (%.0f users/s)',
+            report.users, report.seconds, report.users_per_second
+        )
+        return report
+
+    def _seconds_until_next_run(self) -> float:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        next_run = now.replace(hour=self._valuation_hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += datetime.timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def run_nightly(self) -> None:
+        while True:
+            await asyncio.sleep(self._seconds_until_next_run())
+            try:
+                await self.run()
+            except Exception:
+                logger.exception('Portfolio valuation failed')
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run_nightly())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+portfolio_valuation_job = PortfolioValuationJob()
@@ -1,2 +1,3 @@
 from .postgres_alchemy import *
+from .aiohttp_client import *
 
@@ -0,0 +1,38 @@
+from typing import Optional
+
+import aiohttp
+from settings import settings
+
+
+class HttpClientSession:
+    """
+    Holds one shared aiohttp.ClientSession with keep-alive connection pool.
+    Session is created lazily on first usage, so it is always bound to the
+    running event loop, and it has to be closed on shutdown
+    """
+
+    _session: Optional[aiohttp.ClientSession] = None
+
+    def get(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=settings.COINGECKO_POOL_SIZE,
+                keepalive_timeout=settings.COINGECKO_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=settings.COINGECKO_REQUEST_TIMEOUT,
+                    connect=settings.COINGECKO_CONNECT_TIMEOUT,
+                ),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http_session = HttpClientSession()
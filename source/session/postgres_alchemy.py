@@ -1,7 +1,20 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
 from settings import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 engine = create_async_engine(
     settings.ASYNC_SQLALCHEMY_URL,
     echo=settings.SQLALCHEMY_ECHO,
@@ -9,4 +22,237 @@ engine = create_async_engine(
     max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
 )
 
-async_session = AsyncSession(engine)
+async_session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class ReplicaPool:
+    """
+    Read replica engines. Replication lag of every replica is checked every
+    check_interval seconds, replica which lags more than max_lag seconds or
+    fails check is taken out of rotation until next successful check.
+    Replicas in rotation are chosen round robin
+    """
+
+    # Lag is 0 if replica has replayed everything it received, otherwise it's
+    # age of last replayed transaction. On server which is not replica
+    # functions return NULL, so it's 0 too
+    LAG_QUERY = text(
+        'SELECT COALESCE(CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+        'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END, 0)'
+    )
+
+    def __init__(
+        self,
+        urls: List[str] = settings.SQLALCHEMY_REPLICA_URLS,
+        max_lag: float = settings.SQLALCHEMY_REPLICA_MAX_LAG,
+        check_interval: float = settings.SQLALCHEMY_REPLICA_LAG_CHECK_INTERVAL,
+    ):
+        self._engines: List[AsyncEngine] = [
+            create_async_engine(
+                url,
+                echo=settings.SQLALCHEMY_ECHO,
+                pool_size=settings.SQLALCHEMY_POOL_SIZE,
+                max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
+            )
+            for url in urls
+        ]
+        self._max_lag = max_lag
+        self._check_interval = check_interval
+        self._lags: Dict[AsyncEngine, Optional[float]] = {engine: None for engine in self._engines}
+        self._healthy: List[AsyncEngine] = []
+        self._counter = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def __bool__(self) -> bool:
+        return bool(self._engines)
+
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        return list(self._engines)
+
+    def get_lags(self) -> Dict[str, Optional[float]]:
+        """
+        Returns lag of every replica in seconds, None if replica is unavailable
+        """
+        return {
+            replica.url.render_as_string(hide_password=True): lag
+            for replica, lag in self._lags.items()
+        }
+
+    def choose(self) -> Optional[AsyncEngine]:
+        """
+        Returns next replica in rotation or None if there is no one
+        """
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def _get_lag(
+        self,
+        replica: AsyncEngine
+    ) -> Optional[float]:
+        try:
+            async with replica.connect() as connection:
+                return float(await connection.scalar(self.LAG_QUERY))
+        except Exception as e:
+            logger.warning('Replica %s lag is not checked: %r', replica.url.host, e)
+            return None
+
+    async def check(self) -> None:
+        lags = await asyncio.gather(*[self._get_lag(replica) for replica in self._engines])
+        self._lags = dict(zip(self._engines, lags))
+        self._healthy = [
+            replica for replica, lag in self._lags.items()
+            if lag is not None and lag <= self._max_lag
+        ]
+
+    async def run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self._check_interval)
+
+    def start(self) -> None:
+        if not self._engines:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self._engines:
+            await replica.dispose()
+
+
+replica_pool = ReplicaPool()
+
+
+class UnitOfWork:
+    """
+    Session with one transaction which is shared by all provider calls
+    made inside unit_of_work context.
+    Session of read_only unit of work may be bound to replica.
+    Callbacks added by after_commit are called after transaction is
+    committed, they are dropped on rollback
+    """
+
+    # SQLAlchemy asyncpg dialect sends BEGIN lazily with first statement,
+    # this statement begins transaction before driver connection is used
+    BEGIN_STATEMENT = 'SELECT 1'
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        read_only: bool = False
+    ):
+        self.session = session
+        self.read_only = read_only
+        self._after_commit: List[Callable[[], None]] = []
+        self._driver_connection: Optional[Any] = None
+
+    async def get_driver_connection(self) -> Any:
+        """
+        Returns asyncpg connection of session with transaction of unit of
+        work begun, so statements executed on it directly, e.g. COPY or
+        prepared statements, are committed and rolled back with unit of work
+        """
+        if self._driver_connection is not None:
+            return self._driver_connection
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        # transaction state of dialect connection adapter is internal, it's
+        # used only if adapter has it, otherwise statement begins transaction
+        adapted_connection = raw_connection.connection
+        started = getattr(adapted_connection, '_started', None)
+        start_transaction = getattr(adapted_connection, '_start_transaction', None)
+        if started is False and start_transaction is not None:
+            await start_transaction()
+        elif not started:
+            await connection.exec_driver_sql(self.BEGIN_STATEMENT)
+
+        self._driver_connection = raw_connection.driver_connection
+        return self._driver_connection
+
+    def after_commit(
+        self,
+        callback: Callable[[], None]
+    ) -> None:
+        self._after_commit.append(callback)
+
+
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar('current_unit_of_work', default=None)
+# Monotonic time until which reads of context go to primary after write
+_read_primary_until: ContextVar[float] = ContextVar('read_primary_until', default=0.0)
+
+
+def get_unit_of_work() -> Optional[UnitOfWork]:
+    return _current_unit_of_work.get()
+
+
+def _choose_bind(
+    read_only: bool
+) -> AsyncEngine:
+    if read_only and time.monotonic() >= _read_primary_until.get():
+        return replica_pool.choose() or engine
+    return engine
+
+
+@asynccontextmanager
+async def unit_of_work(
+    read_only: bool = False
+) -> AsyncIterator[UnitOfWork]:
+    """
+    Checks out connection from engine pool and begins transaction, commits it
+    on exit or rolls it back on exception.
+    Nested unit_of_work joins the outer one, so all provider calls of one
+    service call run in one transaction. Every task has its own context, so
+    concurrent updates use different connections of the pool.
+
+    read_only unit of work which is not nested uses replica if there is one
+    in rotation, nested one joins outer unit of work, so reads after writes
+    in the same unit of work see them. After unit of work which is not
+    read_only, reads of the same context go to primary for
+    SQLALCHEMY_REPLICA_MAX_LAG seconds, so they see own writes too
+    """
+    current = _current_unit_of_work.get()
+    if current is not None:
+        if current.read_only and not read_only:
+            raise Exception('Write In Read Only Unit Of Work Exception')
+        yield current
+        return
+
+    async with async_session_factory(bind=_choose_bind(read_only)) as session:
+        uow = UnitOfWork(session, read_only=read_only)
+        token = _current_unit_of_work.set(uow)
+        try:
+            async with session.begin():
+                yield uow
+        finally:
+            _current_unit_of_work.reset(token)
+
+    for callback in uow._after_commit:
+        callback()
+
+    if not read_only and replica_pool:
+        _read_primary_until.set(time.monotonic() + settings.SQLALCHEMY_REPLICA_MAX_LAG)
+
+
+@asynccontextmanager
+async def read_only_session() -> AsyncIterator[AsyncSession]:
+    """
+    Session with read only transaction which is chosen as for read_only
+    unit_of_work, but it's not set as unit of work of context. It's used by
+    async generators, which keep session open while consumer code runs in
+    the same context, so units of work of consumer don't join it.
+    It doesn't see uncommitted writes of current unit of work
+    """
+    async with async_session_factory(bind=_choose_bind(read_only=True)) as session:
+        async with session.begin():
+            yield session